@@ -1,11 +1,14 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+import logging
 import os
 import platform
 from pathlib import Path
 
-db = SQLAlchemy()
+from .profiles import ProfileSession
+
+db = SQLAlchemy(session_options={'class_': ProfileSession})
 
 def get_data_directory():
     """Get the persistent data directory for the application"""
@@ -20,30 +23,75 @@ def get_data_directory():
     data_dir.mkdir(parents=True, exist_ok=True)
     return data_dir
 
-def create_app():
+def create_app(config=None):
+    """Create the Flask app; config overrides the defaults (e.g. a scratch database URI)"""
     app = Flask(__name__)
     
     # Get persistent data directory
     data_dir = get_data_directory()
     db_path = data_dir / 'time_audit.db'
     
-    print(f"📁 Using database: {db_path}")
-    
     # Configuration
     app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DATA_DIR'] = str(data_dir)
+    app.config['PROFILES_DIR'] = str(data_dir / 'profiles')
+    app.config['METRICS_ENABLED'] = os.environ.get('CHRONOCOP_METRICS') == '1'
+    app.config['PROFILER_ENABLED'] = os.environ.get('CHRONOCOP_PROFILER') == '1'
+    app.config['PROFILER_SAMPLE_INTERVAL_MS'] = 1
+    app.config['PROFILER_KEEP'] = 50
+    app.config['CLAUDE_API_URL'] = os.environ.get('CHRONOCOP_CLAUDE_API_URL', 'https://api.anthropic.com/v1/messages')
+    app.config['BACKUP_INTERVAL_MINUTES'] = float(os.environ.get('CHRONOCOP_BACKUP_INTERVAL', 60))
+    app.config['BACKUP_COMPACT_INTERVAL_HOURS'] = 24
+    app.config['BACKUP_KEEP_LAST'] = 24
+    app.config['BACKUP_KEEP_DAILY'] = 14
+    app.config['BACKUP_PAGES_PER_STEP'] = 64
+    app.config['BACKUP_STEP_SLEEP_SECONDS'] = 0.005
+    app.config['EVENTS_HEARTBEAT_SECONDS'] = 15
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('CHRONOCOP_ARCHIVE_AFTER_DAYS', 730))
+    app.config['STORAGE_MODE'] = os.environ.get('CHRONOCOP_STORAGE', 'disk')
+    app.config['STORAGE_FLUSH_SECONDS'] = float(os.environ.get('CHRONOCOP_FLUSH_INTERVAL', 2))
+    if config:
+        app.config.update(config)
+    
+    print(f"📁 Using database: {app.config['SQLALCHEMY_DATABASE_URI'].removeprefix('sqlite:///')}")
+    
+    # One handler for the app's loggers; modules log to children such as chronocop.storage
+    logger = logging.getLogger('chronocop')
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    
+    # Memory mode swaps in its own connections, so it goes before the engine exists
+    from .storage import init_storage
+    init_storage(app)
     
     # Initialize extensions
     db.init_app(app)
     CORS(app)
     
+    from .profiles import init_profiles
+    init_profiles(app)
+    
+    from .metrics import init_metrics
+    init_metrics(app)
+    
+    from .profiler import init_profiler
+    init_profiler(app)
+    
+    from .backup import init_backups
+    init_backups(app)
+    
     # Register routes
     from .routes import main
     app.register_blueprint(main)
     
     # Create tables
+    from .profiles import init_database
     with app.app_context():
-        db.create_all()
+        init_database(db.engine)
     
     return app 
\ No newline at end of file
@@ -0,0 +1,348 @@
+"""Cold-data archival into read-only per-year SQLite files
+
+Entries and summaries older than ARCHIVE_AFTER_DAYS are moved out of the hot
+database into <profile dir>/archive/<year>.db, with activity names stored
+inline so an archive file stands on its own. The move happens in one
+transaction across the hot database and the ATTACHed archive. Reads open
+only the archives whose date range overlaps the query, read-only, and
+merge their rows with the hot results. Everything before the newest
+archive cutoff is read-only.
+"""
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+from .profiles import current_profile, profile_directory, profile_engine
+from .schema import SUMMARY_USAGE_COLUMNS
+from .storage import file_target
+
+ARCHIVE_DDL = [
+    """CREATE TABLE IF NOT EXISTS time_entries (
+        id INTEGER, date TEXT NOT NULL, start_time TEXT NOT NULL, end_time TEXT NOT NULL,
+        activity TEXT NOT NULL, type TEXT NOT NULL, energy_impact TEXT NOT NULL,
+        created_at TEXT, updated_at TEXT, UNIQUE (date, start_time))""",
+    """CREATE TABLE IF NOT EXISTS daily_summaries (
+        id INTEGER, date TEXT NOT NULL UNIQUE, summary TEXT NOT NULL, token_count INTEGER,
+        created_at TEXT, updated_at TEXT, cache_read_tokens INTEGER, cache_creation_tokens INTEGER,
+        latency_ms INTEGER)""",
+    """CREATE TABLE IF NOT EXISTS weekly_summaries (
+        id INTEGER, week_start_date TEXT NOT NULL UNIQUE, summary TEXT NOT NULL, token_count INTEGER,
+        created_at TEXT, updated_at TEXT, cache_read_tokens INTEGER, cache_creation_tokens INTEGER,
+        latency_ms INTEGER)""",
+    "CREATE TABLE IF NOT EXISTS archive_meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+ENTRY_COLUMNS = ('id', 'date', 'start_time', 'end_time', 'activity', 'type', 'energy_impact',
+                 'created_at', 'updated_at')
+DAILY_COLUMNS = ('id', 'date', 'summary', 'token_count', 'created_at', 'updated_at') + SUMMARY_USAGE_COLUMNS
+WEEKLY_COLUMNS = ('id', 'week_start_date', 'summary', 'token_count', 'created_at', 'updated_at') + SUMMARY_USAGE_COLUMNS
+
+# path -> (mtime, meta dict); archives only change while archiving
+_meta_cache = {}
+_archive_lock = threading.Lock()
+
+
+def archive_directory(profile=None):
+    return profile_directory(profile) / 'archive'
+
+
+def archive_paths(profile=None):
+    return sorted(archive_directory(profile).glob('[0-9][0-9][0-9][0-9].db'))
+
+
+def _connect_readonly(path):
+    connection = sqlite3.connect(f'{Path(path).as_uri()}?mode=ro', uri=True)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def archive_meta(path):
+    """{'min_date', 'max_date', 'archived_before'} of one archive file"""
+    mtime = path.stat().st_mtime
+    cached = _meta_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    connection = _connect_readonly(path)
+    try:
+        meta = dict(connection.execute('SELECT key, value FROM archive_meta').fetchall())
+    finally:
+        connection.close()
+    _meta_cache[path] = (mtime, meta)
+    return meta
+
+
+def archived_before(profile=None):
+    """Cutoff date of the newest archive run; entries before it are read-only"""
+    cutoffs = [archive_meta(path).get('archived_before') for path in archive_paths(profile)]
+    cutoffs = [cutoff for cutoff in cutoffs if cutoff]
+    return date.fromisoformat(max(cutoffs)) if cutoffs else None
+
+
+def _overlapping_archives(date_from, date_to):
+    for path in archive_paths():
+        meta = archive_meta(path)
+        if not meta.get('min_date'):
+            continue
+        if date_from and meta['max_date'] < date_from.isoformat():
+            continue
+        if date_to and meta['min_date'] > date_to.isoformat():
+            continue
+        yield path
+
+
+def _iso(value):
+    # SQLAlchemy stores DateTime as 'YYYY-MM-DD HH:MM:SS.ffffff'
+    return value.replace(' ', 'T') if value else None
+
+
+def _entry_dict(row):
+    return {
+        'id': row['id'],
+        'date': row['date'],
+        'start_time': row['start_time'][:5],
+        'end_time': row['end_time'][:5],
+        'activity': row['activity'],
+        'type': row['type'],
+        'energy_impact': row['energy_impact'],
+        'created_at': _iso(row['created_at']),
+        'updated_at': _iso(row['updated_at']),
+        'archived': True
+    }
+
+
+def _summary_dict(row, date_column):
+    # Archives written before the usage columns existed don't have them
+    usage = {column: row[column] if column in row.keys() else None for column in SUMMARY_USAGE_COLUMNS}
+    return {
+        'id': row['id'],
+        date_column: row[date_column],
+        'summary': row['summary'],
+        'token_count': row['token_count'],
+        **usage,
+        'created_at': _iso(row['created_at']),
+        'updated_at': _iso(row['updated_at']),
+        'archived': True
+    }
+
+
+def query_entries(date_from=None, date_to=None, after=None, limit=None):
+    """Archived entry dicts between date_from/date_to (inclusive) in (date, start_time) order
+
+    `after` is a (date, time) keyset position; `limit` caps the rows read per archive.
+    """
+    conditions, params = [], []
+    if date_from:
+        conditions.append('date >= ?')
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append('date <= ?')
+        params.append(date_to.isoformat())
+    if after:
+        conditions.append('(date > ? OR (date = ? AND substr(start_time, 1, 5) > ?))')
+        params += [after[0].isoformat(), after[0].isoformat(), after[1].strftime('%H:%M')]
+
+    sql = f"SELECT {', '.join(ENTRY_COLUMNS)} FROM time_entries"
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += ' ORDER BY date, start_time'
+    if limit:
+        sql += f' LIMIT {int(limit)}'
+
+    entries = []
+    for path in _overlapping_archives(date_from, date_to):
+        connection = _connect_readonly(path)
+        try:
+            entries += [_entry_dict(row) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+    return entries
+
+
+def search_entries(ranks, date_from=None, date_to=None, limit=50):
+    """Archived entries whose activity is a key of `ranks` ({name: rank}), as (rank, entry dict) pairs
+
+    Best (lowest) rank first, then newest first; at most `limit` rows per archive.
+    """
+    if not ranks:
+        return []
+    conditions, params = [], []
+    if date_from:
+        conditions.append('e.date >= ?')
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append('e.date <= ?')
+        params.append(date_to.isoformat())
+
+    columns = ', '.join(f'e.{column}' for column in ENTRY_COLUMNS)
+    values = ', '.join('(?, ?)' for _ in ranks)
+    sql = f"""WITH matches(name, rank) AS (VALUES {values})
+        SELECT {columns}, m.rank FROM time_entries e JOIN matches m ON m.name = e.activity
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY m.rank, e.date DESC, e.start_time DESC LIMIT {int(limit)}"""
+    params = [value for item in ranks.items() for value in item] + params
+
+    results = []
+    for path in _overlapping_archives(date_from, date_to):
+        connection = _connect_readonly(path)
+        try:
+            results += [(row['rank'], _entry_dict(row)) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+    return results
+
+
+def _get_summary(table, date_column, value):
+    for path in _overlapping_archives(value, value):
+        connection = _connect_readonly(path)
+        try:
+            row = connection.execute(f"SELECT * FROM {table} WHERE {date_column} = ?",
+                                     (value.isoformat(),)).fetchone()
+        finally:
+            connection.close()
+        if row:
+            return _summary_dict(row, date_column)
+    return None
+
+
+def get_daily_summary(value):
+    return _get_summary('daily_summaries', 'date', value)
+
+
+def get_weekly_summary(value):
+    return _get_summary('weekly_summaries', 'week_start_date', value)
+
+
+def merge_entries(hot, archived):
+    """Merge two (date, start_time)-ordered lists of entry dicts"""
+    if not archived:
+        return hot
+    return sorted(hot + archived, key=lambda entry: (entry['date'], entry['start_time']))
+
+
+def _cold_ranges(year_start, year_end, cutoff):
+    """Query parameters selecting one year's cold days and cold weeks"""
+    year_range = (year_start.isoformat(), year_end.isoformat(), cutoff.isoformat())
+    # Weeks are only archived once they've fully passed the cutoff
+    week_range = (year_start.isoformat(), year_end.isoformat(), (cutoff - timedelta(days=7)).isoformat())
+    return year_range, week_range
+
+
+def _has_cold_rows(connection, year_start, year_end, cutoff):
+    year_range, week_range = _cold_ranges(year_start, year_end, cutoff)
+    found = connection.exec_driver_sql("""
+        SELECT EXISTS (SELECT 1 FROM main.time_entries WHERE date >= ? AND date <= ? AND date < ?)
+            OR EXISTS (SELECT 1 FROM main.daily_summaries WHERE date >= ? AND date <= ? AND date < ?)
+            OR EXISTS (SELECT 1 FROM main.weekly_summaries
+                       WHERE week_start_date >= ? AND week_start_date <= ? AND week_start_date <= ?)""",
+        year_range + year_range + week_range).scalar()
+    connection.rollback()
+    return bool(found)
+
+
+def _archive_year(connection, path, year_start, year_end, cutoff):
+    """Move one year's cold rows into the archive at `path` within one transaction"""
+    entry_select = ', '.join('a.name' if column == 'activity' else f'e.{column}' for column in ENTRY_COLUMNS)
+    year_range, week_range = _cold_ranges(year_start, year_end, cutoff)
+
+    connection.exec_driver_sql('ATTACH DATABASE ? AS archive', (file_target(path),))
+    try:
+        for statement in ARCHIVE_DDL:
+            connection.exec_driver_sql(statement.replace('IF NOT EXISTS ', 'IF NOT EXISTS archive.', 1))
+        for table in ('daily_summaries', 'weekly_summaries'):
+            existing = {row[1] for row in connection.exec_driver_sql(f'PRAGMA archive.table_info({table})')}
+            for column in SUMMARY_USAGE_COLUMNS:
+                if column not in existing:
+                    connection.exec_driver_sql(f'ALTER TABLE archive.{table} ADD COLUMN {column} INTEGER')
+
+        moved = {}
+        moved['entries'] = connection.exec_driver_sql(f"""
+            INSERT OR REPLACE INTO archive.time_entries ({', '.join(ENTRY_COLUMNS)})
+            SELECT {entry_select} FROM main.time_entries e JOIN main.activities a ON a.id = e.activity_id
+            WHERE e.date >= ? AND e.date <= ? AND e.date < ?""", year_range).rowcount
+        moved['daily_summaries'] = connection.exec_driver_sql(f"""
+            INSERT OR REPLACE INTO archive.daily_summaries ({', '.join(DAILY_COLUMNS)})
+            SELECT {', '.join(DAILY_COLUMNS)} FROM main.daily_summaries
+            WHERE date >= ? AND date <= ? AND date < ?""", year_range).rowcount
+        moved['weekly_summaries'] = connection.exec_driver_sql(f"""
+            INSERT OR REPLACE INTO archive.weekly_summaries ({', '.join(WEEKLY_COLUMNS)})
+            SELECT {', '.join(WEEKLY_COLUMNS)} FROM main.weekly_summaries
+            WHERE week_start_date >= ? AND week_start_date <= ? AND week_start_date <= ?""", week_range).rowcount
+
+        last_change = connection.exec_driver_sql("SELECT coalesce(max(id), 0) FROM main.entry_changes").scalar()
+        connection.exec_driver_sql(
+            "DELETE FROM main.time_entries WHERE date >= ? AND date <= ? AND date < ?", year_range)
+        # Archived entries are history, not deletions: drop the tombstones the
+        # change-log trigger just wrote so sync clients keep their copies
+        connection.exec_driver_sql("DELETE FROM main.entry_changes WHERE id > ?", (last_change,))
+        connection.exec_driver_sql(
+            "DELETE FROM main.daily_summaries WHERE date >= ? AND date <= ? AND date < ?", year_range)
+        connection.exec_driver_sql(
+            "DELETE FROM main.weekly_summaries WHERE week_start_date >= ? AND week_start_date <= ? "
+            "AND week_start_date <= ?", week_range)
+
+        connection.exec_driver_sql("""
+            INSERT OR REPLACE INTO archive.archive_meta (key, value)
+            SELECT 'min_date', min(d) FROM (SELECT min(date) AS d FROM archive.time_entries
+                UNION ALL SELECT min(date) FROM archive.daily_summaries
+                UNION ALL SELECT min(week_start_date) FROM archive.weekly_summaries)
+            UNION ALL
+            SELECT 'max_date', max(d) FROM (SELECT max(date) AS d FROM archive.time_entries
+                UNION ALL SELECT max(date) FROM archive.daily_summaries
+                UNION ALL SELECT date(max(week_start_date), '+6 days') FROM archive.weekly_summaries)""")
+        connection.exec_driver_sql(
+            "INSERT OR REPLACE INTO archive.archive_meta (key, value) VALUES ('archived_before', ?)",
+            (cutoff.isoformat(),))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.exec_driver_sql('DETACH DATABASE archive')
+    return moved
+
+
+def archive_old_data(older_than_days, profile=None, vacuum=True):
+    """Move entries and summaries older than `older_than_days` into per-year archives"""
+    profile = profile or current_profile()
+    cutoff = date.today() - timedelta(days=older_than_days)
+    engine = profile_engine(profile)
+    directory = archive_directory(profile)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    with _archive_lock, engine.connect() as connection:
+        oldest = connection.exec_driver_sql("""
+            SELECT min(d) FROM (SELECT min(date) AS d FROM time_entries
+                UNION ALL SELECT min(date) FROM daily_summaries
+                UNION ALL SELECT min(week_start_date) FROM weekly_summaries)""").scalar()
+        connection.rollback()
+        if not oldest or oldest >= cutoff.isoformat():
+            return {'cutoff': cutoff.isoformat(), 'archives': []}
+
+        for year in range(int(oldest[:4]), cutoff.year + 1):
+            # Gaps between the oldest data and the cutoff shouldn't leave empty archive files
+            if not _has_cold_rows(connection, date(year, 1, 1), date(year, 12, 31), cutoff):
+                continue
+            path = directory / f'{year}.db'
+            moved = _archive_year(connection, path, date(year, 1, 1), date(year, 12, 31), cutoff)
+            _meta_cache.pop(path, None)
+            if any(moved.values()):
+                results.append({'year': year, 'path': str(path), **moved})
+
+        # Hand the freed pages back so the hot file actually shrinks
+        if vacuum and results:
+            connection.exec_driver_sql('VACUUM')
+
+    return {'cutoff': cutoff.isoformat(), 'archives': results}
+
+
+def list_archives(profile=None):
+    archives = []
+    for path in archive_paths(profile):
+        meta = archive_meta(path)
+        archives.append({'year': int(path.stem), 'path': str(path), 'size_bytes': path.stat().st_size,
+                         'min_date': meta.get('min_date'), 'max_date': meta.get('max_date'),
+                         'archived_before': meta.get('archived_before')})
+    return archives
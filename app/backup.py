@@ -0,0 +1,195 @@
+"""Online backups and compacted snapshots of each profile's database
+
+Snapshots use SQLite's online backup API a few pages at a time, so the
+source is only locked for one short step at a time and writers carry on
+between steps. Compacted snapshots use VACUUM INTO, which also drops free
+pages and defragments. Both land in <profile dir>/backups/ and are pruned
+by a retention policy; a background thread takes them on a schedule
+(CHRONOCOP_BACKUP_INTERVAL minutes, 0 disables).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .profiles import current_profile, get_registry, profile_directory, profile_engine
+from .storage import file_target
+
+logger = logging.getLogger('chronocop.backup')
+
+BACKUP_KINDS = ('snapshot', 'compact')
+TIMESTAMP_FORMAT = '%Y%m%d-%H%M%S-%f'
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _profile_lock(profile):
+    with _locks_guard:
+        return _locks.setdefault(profile, threading.Lock())
+
+
+def backup_directory(profile=None):
+    return profile_directory(profile) / 'backups'
+
+
+def _backup_info(path):
+    kind, _, stamp = path.stem.partition('-')
+    stat = path.stat()
+    return {
+        'name': path.name,
+        'kind': kind,
+        'path': str(path),
+        'size_bytes': stat.st_size,
+        'created_at': datetime.strptime(stamp, TIMESTAMP_FORMAT).isoformat(),
+    }
+
+
+def list_backups(profile=None):
+    """Finished backups for a profile, newest first"""
+    directory = backup_directory(profile)
+    paths = [path for kind in BACKUP_KINDS for path in directory.glob(f'{kind}-*.db')]
+    return [_backup_info(path) for path in sorted(paths, key=lambda path: path.stem.partition('-')[2], reverse=True)]
+
+
+def _online_backup(engine, destination, pages, sleep):
+    raw = engine.raw_connection()
+    try:
+        target = sqlite3.connect(destination)
+        try:
+            # The source's shared lock is only held during each step of `pages`
+            # pages; sqlite3's own `sleep` only applies when a step hits BUSY, so
+            # yield to writers from the progress callback instead. A write from
+            # another connection makes SQLite restart from a fresh view rather
+            # than produce a torn copy.
+            raw.driver_connection.backup(target, pages=pages, progress=lambda *_: time.sleep(sleep))
+        finally:
+            target.close()
+    finally:
+        raw.close()
+
+
+def _vacuum_into(engine, destination):
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.execute('VACUUM INTO ?', (file_target(destination),))
+    finally:
+        raw.close()
+
+
+def create_backup(profile=None, kind='snapshot', app=None):
+    """Write a new backup of a profile's database and apply the retention policy"""
+    from flask import current_app
+
+    if kind not in BACKUP_KINDS:
+        raise ValueError(f"kind must be one of: {', '.join(BACKUP_KINDS)}")
+
+    app = app or current_app
+    profile = profile or current_profile()
+    directory = backup_directory(profile)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with _profile_lock(profile):
+        final_path = directory / f"{kind}-{datetime.now().strftime(TIMESTAMP_FORMAT)}.db"
+        partial_path = final_path.with_suffix('.db.partial')
+        engine = profile_engine(profile)
+
+        started = time.perf_counter()
+        try:
+            if kind == 'compact':
+                _vacuum_into(engine, str(partial_path))
+            else:
+                _online_backup(engine, str(partial_path), app.config['BACKUP_PAGES_PER_STEP'],
+                               app.config['BACKUP_STEP_SLEEP_SECONDS'])
+            # Only complete copies ever carry the .db name
+            os.replace(partial_path, final_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+        prune_backups(profile, app.config['BACKUP_KEEP_LAST'], app.config['BACKUP_KEEP_DAILY'])
+
+    info = _backup_info(final_path)
+    info['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"💾 {kind} of profile '{profile}' written to {final_path} ({info['elapsed_ms']}ms)")
+    return info
+
+
+def prune_backups(profile=None, keep_last=24, keep_daily=14):
+    """Keep the newest `keep_last` backups plus the newest one of each of the last `keep_daily` days"""
+    backups = list_backups(profile)
+    keep = {backup['name'] for backup in backups[:keep_last]}
+
+    days_seen = set()
+    for backup in backups:
+        day = backup['created_at'][:10]
+        if day not in days_seen and len(days_seen) < keep_daily:
+            days_seen.add(day)
+            keep.add(backup['name'])
+
+    removed = []
+    for backup in backups:
+        if backup['name'] not in keep:
+            Path(backup['path']).unlink(missing_ok=True)
+            removed.append(backup['name'])
+    return removed
+
+
+def _latest_backup_time(profile, kind):
+    times = [datetime.fromisoformat(backup['created_at']).timestamp()
+             for backup in list_backups(profile) if backup['kind'] == kind]
+    return max(times, default=0)
+
+
+class BackupScheduler(threading.Thread):
+    """Daemon thread taking snapshots (and, less often, compactions) of every profile"""
+
+    def __init__(self, app):
+        super().__init__(name='chronocop-backups', daemon=True)
+        self.app = app
+        self.interval = app.config['BACKUP_INTERVAL_MINUTES'] * 60
+        self.compact_interval = app.config['BACKUP_COMPACT_INTERVAL_HOURS'] * 3600
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            with self.app.app_context():
+                for profile in get_registry(self.app).names():
+                    try:
+                        self.backup_if_due(profile)
+                    except Exception as e:
+                        logger.error(f"❌ Scheduled backup of profile '{profile}' failed: {e}")
+
+    def backup_if_due(self, profile):
+        registry = get_registry(self.app)
+        now = time.time()
+        if self.compact_interval and now - _latest_backup_time(profile, 'compact') >= self.compact_interval:
+            create_backup(profile, 'compact', self.app)
+            return
+
+        # Unchanged since the last snapshot: nothing new to save
+        modified = Path(registry.database_path(profile)).stat().st_mtime
+        if modified > _latest_backup_time(profile, 'snapshot'):
+            create_backup(profile, 'snapshot', self.app)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def init_backups(app):
+    """Start the backup schedule with the first request (not in the reloader's watcher process)"""
+    if not app.config['BACKUP_INTERVAL_MINUTES']:
+        return
+
+    started = threading.Lock()
+
+    def start_scheduler():
+        if 'chronocop_backups' in app.extensions or not started.acquire(blocking=False):
+            return
+        scheduler = BackupScheduler(app)
+        app.extensions['chronocop_backups'] = scheduler
+        scheduler.start()
+
+    app.before_request(start_scheduler)
@@ -0,0 +1,105 @@
+"""Server-Sent Events for entry, summary and settings changes
+
+Write paths call publish() after they commit; every open /api/events stream
+of the same profile gets the event. Each profile keeps a short history so a
+reconnecting EventSource (which sends Last-Event-ID) receives what it
+missed, or a 'resync' event when the gap is too old to replay.
+"""
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+from .profiles import current_profile
+
+EVENT_HISTORY = 256
+SUBSCRIBER_QUEUE_SIZE = 512
+
+
+class EventBroker:
+    """Fan-out of published events to per-profile subscriber queues"""
+
+    def __init__(self, history=EVENT_HISTORY, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self._lock = threading.Lock()
+        # Ids from an earlier server process are always below this one's
+        self.first_id = int(time.time() * 1000)
+        self._ids = itertools.count(self.first_id + 1)
+        self._subscribers = {}
+        self._history = {}
+        self._history_size = history
+        self._queue_size = queue_size
+
+    def publish(self, profile, event_type, data):
+        with self._lock:
+            event = (next(self._ids), event_type, data)
+            self._history.setdefault(profile, deque(maxlen=self._history_size)).append(event)
+            subscribers = list(self._subscribers.get(profile, ()))
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Client isn't keeping up: drop its backlog and make it refetch
+                _reset(subscriber, (event[0], 'resync', {'reason': 'overflow'}))
+        return event[0]
+
+    def subscribe(self, profile, last_event_id=None):
+        """New subscriber queue, pre-filled with events after last_event_id if any"""
+        subscriber = queue.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.setdefault(profile, set()).add(subscriber)
+            history = list(self._history.get(profile, ()))
+
+        if last_event_id is not None:
+            missed = [event for event in history if event[0] > last_event_id]
+            if last_event_id < self.first_id:
+                missed = [(self.first_id, 'resync', {'reason': 'restart'})]
+            elif len(history) == self._history_size and history[0][0] > last_event_id:
+                # Events after last_event_id may have been evicted already
+                missed = [(history[-1][0], 'resync', {'reason': 'history'})]
+            for event in missed[-self._queue_size:]:
+                subscriber.put_nowait(event)
+        return subscriber
+
+    def unsubscribe(self, profile, subscriber):
+        with self._lock:
+            self._subscribers.get(profile, set()).discard(subscriber)
+
+
+def _reset(subscriber, event):
+    while True:
+        try:
+            subscriber.get_nowait()
+        except queue.Empty:
+            break
+    subscriber.put_nowait(event)
+
+
+broker = EventBroker()
+
+
+def publish(event_type, data, profile=None):
+    """Announce a committed change to the current profile's listeners"""
+    return broker.publish(profile or current_profile(), event_type, data)
+
+
+def format_event(event):
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream(profile, last_event_id=None, heartbeat_seconds=15):
+    """Generator of SSE frames for one client; ends when the client disconnects"""
+    subscriber = broker.subscribe(profile, last_event_id)
+    try:
+        # Reconnect delay for EventSource, and something to flush headers with
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                yield format_event(subscriber.get(timeout=heartbeat_seconds))
+            except queue.Empty:
+                yield ': keepalive\n\n'
+    finally:
+        broker.unsubscribe(profile, subscriber)
@@ -0,0 +1,187 @@
+"""Opt-in request instrumentation (set CHRONOCOP_METRICS=1)
+
+Records per-route wall time, SQL statement count and time, external HTTP
+latency (Claude calls) and response size. Aggregates are served as latency
+histograms from /api/_metrics and every request is logged as one JSON line
+on the 'chronocop.metrics' logger.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('chronocop.metrics')
+
+# Upper bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (max for the open bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        # Cumulative [upper bound, count] pairs, Prometheus-style
+        cumulative = 0
+        buckets = []
+        for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += bucket_count
+            buckets.append([bound, cumulative])
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'max': round(self.max, 3),
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': buckets
+        }
+
+
+class Metrics:
+    """Thread-safe registry of histograms keyed by (metric name, label)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self.started_at = time.time()
+
+    def observe(self, name, label, value, buckets=LATENCY_BUCKETS_MS):
+        with self._lock:
+            key = (name, label)
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(buckets)
+            self._histograms[key].observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for (name, label), histogram in sorted(self._histograms.items()):
+                result.setdefault(name, {})[label] = histogram.to_dict()
+        return {'uptime_seconds': round(time.time() - self.started_at, 1), 'metrics': result}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+metrics = Metrics()
+_enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def record_external_call(service, elapsed_ms, status=None):
+    """Record latency of an outbound HTTP call (e.g. service='claude')"""
+    if not _enabled:
+        return
+    metrics.observe('external_ms', service, elapsed_ms)
+    if has_request_context() and 'metrics' in g:
+        g.metrics['external_ms'] += elapsed_ms
+        g.metrics['external_calls'].append({'service': service, 'ms': round(elapsed_ms, 2), 'status': status})
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The execution context belongs to this one statement, so a statement that
+    # raises (and never reaches after_cursor_execute) leaves nothing behind
+    context._chronocop_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._chronocop_query_start) * 1000
+    if has_request_context() and 'metrics' in g:
+        g.metrics['sql_count'] += 1
+        g.metrics['sql_ms'] += elapsed_ms
+
+
+def _before_request():
+    g.metrics = {'start': time.perf_counter(), 'sql_count': 0, 'sql_ms': 0.0,
+                 'external_ms': 0.0, 'external_calls': []}
+
+
+def _after_request(response):
+    if 'metrics' not in g:
+        return response
+
+    sample = g.metrics
+    elapsed_ms = (time.perf_counter() - sample['start']) * 1000
+    route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+    # Streamed responses (e.g. event streams) have no size up front
+    response_bytes = None if response.is_streamed else response.calculate_content_length()
+
+    metrics.observe('request_ms', route, elapsed_ms)
+    metrics.observe('sql_ms', route, sample['sql_ms'])
+    metrics.observe('sql_statements', route, sample['sql_count'], COUNT_BUCKETS)
+    if response_bytes is not None:
+        metrics.observe('response_bytes', route, response_bytes, SIZE_BUCKETS_BYTES)
+
+    logger.info(json.dumps({
+        'event': 'request',
+        'route': route,
+        'path': request.path,
+        'profile': g.get('profile'),
+        'status': response.status_code,
+        'ms': round(elapsed_ms, 2),
+        'sql_count': sample['sql_count'],
+        'sql_ms': round(sample['sql_ms'], 2),
+        'external_ms': round(sample['external_ms'], 2),
+        'external_calls': sample['external_calls'],
+        'response_bytes': response_bytes
+    }))
+    return response
+
+
+def instrument_engine(app, engine):
+    """Time the SQL statements of one of the app's engines, if the app has metrics enabled"""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def init_metrics(app):
+    """Install request hooks and SQL listeners if METRICS_ENABLED is set"""
+    global _enabled
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    # Named profiles' engines are instrumented by the registry as it creates them
+    from . import db
+    with app.app_context():
+        instrument_engine(app, db.engine)
+    _enabled = True
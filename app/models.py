@@ -1,6 +1,61 @@
 from datetime import datetime, time, timedelta
+from sqlalchemy import bindparam, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from . import db
 
+# What bulk entry writes (week copies, templates) do with occupied slots
+CONFLICT_POLICIES = ('skip', 'replace', 'fail')
+
+# Monday=0 weekday of a stored date, matching date.weekday()
+WEEKDAY_SQL = "(CAST(strftime('%w', {}) AS INTEGER) + 6) % 7"
+
+class Activity(db.Model):
+    __tablename__ = 'activities'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), unique=True, nullable=False)
+    name_key = db.Column(db.String(200), nullable=False, index=True)  # Case-folded name for prefix lookups
+    usage_count = db.Column(db.Integer, nullable=False, default=0, index=True)  # Maintained by triggers in schema.py
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'usage_count': self.usage_count
+        }
+    
+    @staticmethod
+    def make_key(name):
+        """Normalise a name or prefix for case-insensitive prefix matching"""
+        return name.casefold()
+    
+    @staticmethod
+    def intern(name):
+        """Get the activity with this exact name, creating it if needed"""
+        activity = Activity.query.filter_by(name=name).first()
+        if activity:
+            return activity
+        
+        # ON CONFLICT so a concurrent writer interning the same name doesn't fail this one
+        db.session.execute(
+            sqlite_insert(Activity)
+            .values(name=name, name_key=Activity.make_key(name), usage_count=0, created_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=['name'])
+        )
+        return Activity.query.filter_by(name=name).one()
+    
+    @staticmethod
+    def suggest(prefix, limit=10):
+        """Most frequently used activities starting with prefix (case-insensitive)"""
+        query = Activity.query.filter(Activity.usage_count > 0)
+        if prefix:
+            key = Activity.make_key(prefix)
+            # Range scan on the name_key index instead of LIKE, which SQLite can't index here
+            query = query.filter(Activity.name_key >= key, Activity.name_key < key + '\U0010ffff')
+        return query.order_by(Activity.usage_count.desc(), Activity.name).limit(limit).all()
+
+
 class TimeEntry(db.Model):
     __tablename__ = 'time_entries'
     
@@ -8,12 +63,14 @@ class TimeEntry(db.Model):
     date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
-    activity = db.Column(db.String(200), nullable=False)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activities.id'), nullable=False, index=True)
     type = db.Column(db.Enum('planned', 'reactive', name='activity_type'), nullable=False)
     energy_impact = db.Column(db.Enum('energised', 'neutral', 'drained', name='energy_impact'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    activity_ref = db.relationship('Activity', lazy='joined')
+    
     __table_args__ = (
         db.UniqueConstraint('date', 'start_time', name='unique_date_time'),
     )
@@ -30,6 +87,14 @@ class TimeEntry(db.Model):
         end_datetime = start_datetime + timedelta(minutes=30)
         self.end_time = end_datetime.time()
     
+    @property
+    def activity(self):
+        return self.activity_ref.name
+    
+    @activity.setter
+    def activity(self, name):
+        self.activity_ref = Activity.intern(name)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -51,6 +116,74 @@ class TimeEntry(db.Model):
             return time_obj.minute in [0, 30]
         except ValueError:
             return False
+    
+    @staticmethod
+    def bulk_insert(select_sql, targets_sql, params, on_conflict='skip'):
+        """INSERT ... SELECT entries; targets_sql selects the (date, start_time) pairs being written
+
+        Replace deletes the occupied slots first (rather than INSERT OR REPLACE)
+        so the delete triggers keep usage counts and the change log right;
+        fail lets the unique constraint raise IntegrityError.
+        """
+        replaced = 0
+        if on_conflict == 'replace':
+            replaced = db.session.execute(
+                text(targets_sql.format(statement='DELETE FROM time_entries WHERE (date, start_time) IN')),
+                params
+            ).rowcount
+        
+        copied = db.session.execute(
+            text(select_sql + (' ON CONFLICT DO NOTHING' if on_conflict == 'skip' else ''))
+            .bindparams(bindparam('now', type_=db.DateTime)),
+            {**params, 'now': datetime.utcnow()}
+        ).rowcount
+        return copied, replaced
+    
+    @staticmethod
+    def copy_week(source_start, target_start, on_conflict='skip'):
+        """Copy the week starting source_start onto the week starting target_start"""
+        params = {
+            'source_start': source_start.isoformat(),
+            'source_end': (source_start + timedelta(days=6)).isoformat(),
+            'offset': f'{(target_start - source_start).days:+d} days'
+        }
+        source_count = db.session.execute(text(
+            "SELECT count(*) FROM time_entries WHERE date BETWEEN :source_start AND :source_end"
+        ), params).scalar()
+        
+        copied, replaced = TimeEntry.bulk_insert(
+            """INSERT INTO time_entries (date, start_time, end_time, activity_id, type, energy_impact,
+                                          created_at, updated_at)
+               SELECT date(date, :offset), start_time, end_time, activity_id, type, energy_impact, :now, :now
+               FROM time_entries WHERE date BETWEEN :source_start AND :source_end""",
+            """{statement} (SELECT date(date, :offset), start_time FROM time_entries
+                            WHERE date BETWEEN :source_start AND :source_end)""",
+            params, on_conflict
+        )
+        db.session.commit()
+        return {'copied': copied, 'skipped': source_count - copied, 'replaced': replaced}
+
+
+class EntryChange(db.Model):
+    __tablename__ = 'entry_changes'
+    
+    # Rows are written by triggers on time_entries (see schema.py). Only the
+    # latest change per entry is kept; deletes stay behind as tombstones.
+    id = db.Column(db.Integer, primary_key=True)  # Sync cursor, never reused
+    entry_id = db.Column(db.Integer, nullable=False, index=True)
+    operation = db.Column(db.Enum('upsert', 'delete', name='change_operation'), nullable=False)
+    
+    __table_args__ = (
+        {'sqlite_autoincrement': True},
+    )
+    
+    @staticmethod
+    def latest_cursor():
+        """Highest cursor ever issued, including compacted-away changes"""
+        row = db.session.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = 'entry_changes'")
+        ).first()
+        return row[0] if row else 0
 
 
 class AppSettings(db.Model):
@@ -98,6 +231,9 @@ class DailySummary(db.Model):
     date = db.Column(db.Date, unique=True, nullable=False)
     summary = db.Column(db.Text, nullable=False)
     token_count = db.Column(db.Integer, nullable=True)  # Track API usage
+    cache_read_tokens = db.Column(db.Integer, nullable=True)  # Prompt tokens served from Claude's cache
+    cache_creation_tokens = db.Column(db.Integer, nullable=True)  # Prompt tokens written to the cache
+    latency_ms = db.Column(db.Integer, nullable=True)  # Claude call latency
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -107,6 +243,9 @@ class DailySummary(db.Model):
             'date': self.date.isoformat(),
             'summary': self.summary,
             'token_count': self.token_count,
+            'cache_read_tokens': self.cache_read_tokens,
+            'cache_creation_tokens': self.cache_creation_tokens,
+            'latency_ms': self.latency_ms,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -119,27 +258,24 @@ class DailySummary(db.Model):
         return DailySummary.query.filter_by(date=date).first()
     
     @staticmethod
-    def create_summary(date, summary, token_count=None):
+    def create_summary(date, summary, token_count=None, cache_read_tokens=None, cache_creation_tokens=None,
+                       latency_ms=None):
         """Create or update a daily summary"""
         if isinstance(date, str):
             date = datetime.strptime(date, '%Y-%m-%d').date()
         
-        existing = DailySummary.query.filter_by(date=date).first()
-        if existing:
-            existing.summary = summary
-            existing.token_count = token_count
-            existing.updated_at = datetime.utcnow()
-            daily_summary = existing
-        else:
-            daily_summary = DailySummary(
-                date=date,
-                summary=summary,
-                token_count=token_count
-            )
-            db.session.add(daily_summary)
-        
+        # A single upsert, so concurrent generations for the same date can't
+        # both insert and trip the unique constraint
+        now = datetime.utcnow()
+        values = {'summary': summary, 'token_count': token_count, 'cache_read_tokens': cache_read_tokens,
+                  'cache_creation_tokens': cache_creation_tokens, 'latency_ms': latency_ms, 'updated_at': now}
+        db.session.execute(
+            sqlite_insert(DailySummary)
+            .values(date=date, created_at=now, **values)
+            .on_conflict_do_update(index_elements=['date'], set_=values)
+        )
         db.session.commit()
-        return daily_summary
+        return DailySummary.query.filter_by(date=date).one()
 
 
 class WeeklySummary(db.Model):
@@ -149,6 +285,9 @@ class WeeklySummary(db.Model):
     week_start_date = db.Column(db.Date, unique=True, nullable=False)  # Monday of the week
     summary = db.Column(db.Text, nullable=False)
     token_count = db.Column(db.Integer, nullable=True)  # Track API usage
+    cache_read_tokens = db.Column(db.Integer, nullable=True)  # Prompt tokens served from Claude's cache
+    cache_creation_tokens = db.Column(db.Integer, nullable=True)  # Prompt tokens written to the cache
+    latency_ms = db.Column(db.Integer, nullable=True)  # Claude call latency
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -158,6 +297,9 @@ class WeeklySummary(db.Model):
             'week_start_date': self.week_start_date.isoformat(),
             'summary': self.summary,
             'token_count': self.token_count,
+            'cache_read_tokens': self.cache_read_tokens,
+            'cache_creation_tokens': self.cache_creation_tokens,
+            'latency_ms': self.latency_ms,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -170,24 +312,125 @@ class WeeklySummary(db.Model):
         return WeeklySummary.query.filter_by(week_start_date=week_start_date).first()
     
     @staticmethod
-    def create_summary(week_start_date, summary, token_count=None):
+    def create_summary(week_start_date, summary, token_count=None, cache_read_tokens=None,
+                       cache_creation_tokens=None, latency_ms=None):
         """Create or update a weekly summary"""
         if isinstance(week_start_date, str):
             week_start_date = datetime.strptime(week_start_date, '%Y-%m-%d').date()
         
-        existing = WeeklySummary.query.filter_by(week_start_date=week_start_date).first()
-        if existing:
-            existing.summary = summary
-            existing.token_count = token_count
-            existing.updated_at = datetime.utcnow()
-            weekly_summary = existing
-        else:
-            weekly_summary = WeeklySummary(
-                week_start_date=week_start_date,
-                summary=summary,
-                token_count=token_count
-            )
-            db.session.add(weekly_summary)
+        now = datetime.utcnow()
+        values = {'summary': summary, 'token_count': token_count, 'cache_read_tokens': cache_read_tokens,
+                  'cache_creation_tokens': cache_creation_tokens, 'latency_ms': latency_ms, 'updated_at': now}
+        db.session.execute(
+            sqlite_insert(WeeklySummary)
+            .values(week_start_date=week_start_date, created_at=now, **values)
+            .on_conflict_do_update(index_elements=['week_start_date'], set_=values)
+        )
+        db.session.commit()
+        return WeeklySummary.query.filter_by(week_start_date=week_start_date).one()
+
+
+class WeekTemplate(db.Model):
+    __tablename__ = 'week_templates'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    slots = db.relationship('WeekTemplateSlot', cascade='all, delete-orphan',
+                            order_by='(WeekTemplateSlot.weekday, WeekTemplateSlot.start_time)')
+    
+    def to_dict(self, include_slots=False):
+        result = {
+            'id': self.id,
+            'name': self.name,
+            'slot_count': self.slot_count,
+            'created_at': self.created_at.isoformat()
+        }
+        if include_slots:
+            result['slots'] = [slot.to_dict() for slot in self.slots]
+        return result
+    
+    @staticmethod
+    def from_week(name, week_start):
+        """Save the week starting week_start as a template in one INSERT ... SELECT"""
+        template = WeekTemplate(name=name)
+        db.session.add(template)
+        db.session.flush()
         
+        db.session.execute(text(f"""
+            INSERT INTO week_template_slots (template_id, weekday, start_time, end_time, activity_id,
+                                             type, energy_impact)
+            SELECT :template_id, {WEEKDAY_SQL.format('date')}, start_time, end_time, activity_id,
+                   type, energy_impact
+            FROM time_entries WHERE date BETWEEN :week_start AND :week_end
+        """), {'template_id': template.id, 'week_start': week_start.isoformat(),
+               'week_end': (week_start + timedelta(days=6)).isoformat()})
         db.session.commit()
-        return weekly_summary 
\ No newline at end of file
+        db.session.refresh(template)
+        return template
+    
+    def apply(self, date_from, date_to, on_conflict='skip'):
+        """Stamp the template onto every day from date_from to date_to (inclusive)"""
+        params = {'template_id': self.id, 'date_from': date_from.isoformat(), 'date_to': date_to.isoformat()}
+        days_cte = """WITH RECURSIVE days(day) AS (
+                SELECT :date_from UNION ALL SELECT date(day, '+1 day') FROM days WHERE day < :date_to
+            )"""
+        slot_join = f"""FROM days JOIN week_template_slots s
+                ON s.template_id = :template_id AND s.weekday = {WEEKDAY_SQL.format('days.day')}"""
+        
+        # The CTE goes inside the INSERT/DELETE: sqlite3 only reports rowcount for
+        # statements that start with the DML keyword
+        copied, replaced = TimeEntry.bulk_insert(
+            f"""INSERT INTO time_entries (date, start_time, end_time, activity_id, type, energy_impact,
+                                      created_at, updated_at)
+            {days_cte}
+            SELECT days.day, s.start_time, s.end_time, s.activity_id, s.type, s.energy_impact, :now, :now
+            {slot_join}
+            WHERE true""",
+            f"""{{statement}} ({days_cte} SELECT days.day, s.start_time {slot_join})""",
+            params, on_conflict
+        )
+        slot_count = db.session.execute(text(
+            f"{days_cte} SELECT count(*) {slot_join}"
+        ), params).scalar()
+        db.session.commit()
+        return {'copied': copied, 'skipped': slot_count - copied, 'replaced': replaced}
+
+
+class WeekTemplateSlot(db.Model):
+    __tablename__ = 'week_template_slots'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    template_id = db.Column(db.Integer, db.ForeignKey('week_templates.id'), nullable=False)
+    weekday = db.Column(db.Integer, nullable=False)  # 0 = Monday
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activities.id'), nullable=False)
+    type = db.Column(db.Enum('planned', 'reactive', name='activity_type'), nullable=False)
+    energy_impact = db.Column(db.Enum('energised', 'neutral', 'drained', name='energy_impact'), nullable=False)
+    
+    activity_ref = db.relationship('Activity', lazy='joined')
+    
+    __table_args__ = (
+        db.UniqueConstraint('template_id', 'weekday', 'start_time', name='unique_template_slot'),
+    )
+    
+    def to_dict(self):
+        return {
+            'weekday': self.weekday,
+            'start_time': self.start_time.strftime('%H:%M'),
+            'end_time': self.end_time.strftime('%H:%M'),
+            'activity': self.activity_ref.name,
+            'type': self.type,
+            'energy_impact': self.energy_impact
+        }
+
+
+# Counted in SQL so listing templates doesn't load every slot
+WeekTemplate.slot_count = db.column_property(
+    select(func.count(WeekTemplateSlot.id))
+    .where(WeekTemplateSlot.template_id == WeekTemplate.id)
+    .correlate_except(WeekTemplateSlot)
+    .scalar_subquery()
+)
@@ -0,0 +1,190 @@
+"""On-demand profiling of individual requests (set CHRONOCOP_PROFILER=1)
+
+When enabled, a request is profiled if it carries the X-Chronocop-Profiler
+header or a ?_profiler=1 query flag, or if POST /api/_profiler armed the
+next N requests. Each profiled request leaves three files in
+<data dir>/profiler/:
+
+- <name>.prof       cProfile stats, for pstats / snakeviz
+- <name>.txt        the same stats as text, sorted by cumulative time
+- <name>.collapsed  sampled stacks ("a;b;c count"), for flamegraph.pl or speedscope
+"""
+import cProfile
+import io
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from flask import current_app, g, request
+
+PROFILER_HEADER = 'X-Chronocop-Profiler'
+OUTPUT_HEADER = 'X-Chronocop-Profiler-Output'
+OUTPUT_SUFFIXES = ('.prof', '.txt', '.collapsed')
+# Requests that never use up an armed count: the profiler's own routes, the
+# page shell and its assets, and the long-lived event stream
+UNARMED_ENDPOINTS = ('main.get_profiler', 'main.arm_profiler', 'main.index', 'main.event_stream', 'static')
+
+_lock = threading.Lock()
+_armed = 0
+# cProfile can't run two profilers at once on 3.12+, so profile one request at a time
+_active = threading.Lock()
+_enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def arm(count):
+    """Profile the next `count` requests (0 disarms); returns the number armed"""
+    global _armed
+    with _lock:
+        _armed = count
+    return count
+
+
+def armed():
+    with _lock:
+        return _armed
+
+
+def _take_armed():
+    global _armed
+    with _lock:
+        if _armed > 0:
+            _armed -= 1
+            return True
+    return False
+
+
+def profiler_directory(app=None):
+    return Path((app or current_app).config['DATA_DIR']) / 'profiler'
+
+
+def list_dumps(app=None):
+    """Profiles on disk, newest first"""
+    dumps = []
+    for path in sorted(profiler_directory(app).glob('*.prof'), reverse=True):
+        dumps.append({
+            'name': path.stem,
+            'created_at': datetime.fromtimestamp(path.stat().st_mtime).isoformat(),
+            'files': [str(path.with_suffix(suffix)) for suffix in OUTPUT_SUFFIXES
+                      if path.with_suffix(suffix).exists()]
+        })
+    return dumps
+
+
+def _prune(directory, keep):
+    for path in sorted(directory.glob('*.prof'), reverse=True)[keep:]:
+        for suffix in OUTPUT_SUFFIXES:
+            path.with_suffix(suffix).unlink(missing_ok=True)
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='chronocop-profiler-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({'/'.join(Path(code.co_filename).parts[-2:])}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _wants_profile():
+    if request.headers.get(PROFILER_HEADER) or request.args.get('_profiler'):
+        return True
+    return request.endpoint not in UNARMED_ENDPOINTS and _take_armed()
+
+
+def _before_request():
+    if not _wants_profile():
+        return
+    if not _active.acquire(blocking=False):
+        # Another request is being profiled; say so instead of silently skipping
+        g.profiler_busy = True
+        return
+
+    sampler = StackSampler(threading.get_ident(), current_app.config['PROFILER_SAMPLE_INTERVAL_MS'] / 1000)
+    profile = cProfile.Profile()
+    g.profiler = {'profile': profile, 'sampler': sampler, 'started': time.perf_counter()}
+    sampler.start()
+    profile.enable()
+
+
+def _finish(status):
+    """Stop profiling the current request and write its files; returns the dump name"""
+    state = g.pop('profiler', None)
+    if state is None:
+        return None
+    try:
+        state['profile'].disable()
+        state['sampler'].stop()
+        elapsed_ms = (time.perf_counter() - state['started']) * 1000
+
+        directory = profiler_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        endpoint = re.sub(r'[^A-Za-z0-9_-]', '_', request.endpoint or 'unmatched')
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{request.method}-{endpoint}"
+        path = directory / name
+
+        state['profile'].dump_stats(path.with_suffix('.prof'))
+
+        report = io.StringIO()
+        report.write(f"{request.method} {request.full_path.rstrip('?')} -> {status} in {elapsed_ms:.1f}ms\n\n")
+        pstats.Stats(state['profile'], stream=report).sort_stats('cumulative').print_stats(60)
+        path.with_suffix('.txt').write_text(report.getvalue())
+
+        path.with_suffix('.collapsed').write_text(
+            ''.join(f'{stack} {count}\n' for stack, count in sorted(state['sampler'].stacks.items())))
+
+        _prune(directory, current_app.config['PROFILER_KEEP'])
+        return name
+    finally:
+        _active.release()
+
+
+def _after_request(response):
+    name = _finish(response.status_code)
+    if name:
+        response.headers[OUTPUT_HEADER] = name
+    elif g.pop('profiler_busy', False):
+        response.headers[OUTPUT_HEADER] = 'busy'
+    return response
+
+
+def _teardown_request(error):
+    # Requests that failed before after_request still get their profile written
+    _finish(500)
+
+
+def init_profiler(app):
+    """Install the per-request profiling hooks if PROFILER_ENABLED is set"""
+    global _enabled
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    _enabled = True
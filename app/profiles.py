@@ -0,0 +1,131 @@
+"""Named profiles, each with its own SQLite file and connection pool
+
+The default profile keeps using time_audit.db in the data directory; every
+other profile lives in profiles/<name>/time_audit.db. A request picks its
+profile with the X-Chronocop-Profile header or the ?profile= query param,
+and ProfileSession routes all of its queries to that profile's engine, so
+writers on different profiles never contend for the same file lock.
+"""
+import re
+import threading
+from pathlib import Path
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, jsonify, request
+from flask_sqlalchemy.session import Session
+
+from .metrics import instrument_engine
+from .storage import engine_options
+
+PROFILE_HEADER = 'X-Chronocop-Profile'
+DEFAULT_PROFILE = 'default'
+PROFILE_NAME = re.compile(r'^[a-z0-9][a-z0-9_-]{0,39}$')
+DATABASE_FILENAME = 'time_audit.db'
+
+
+def current_profile():
+    """Profile of the current request, or the default outside of one"""
+    if has_app_context():
+        return g.get('profile', DEFAULT_PROFILE)
+    return DEFAULT_PROFILE
+
+
+def profile_directory(profile=None, app=None):
+    """Directory holding a profile's database (and its backups, archives...)"""
+    app = app or current_app
+    profile = profile or current_profile()
+    if profile == DEFAULT_PROFILE:
+        return Path(app.config['DATA_DIR'])
+    return Path(app.config['PROFILES_DIR']) / profile
+
+
+class EngineRegistry:
+    """Lazily created engine (and so connection pool) per named profile"""
+
+    def __init__(self, app):
+        self.app = app
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def database_path(self, profile):
+        if profile == DEFAULT_PROFILE:
+            return self.app.config['SQLALCHEMY_DATABASE_URI'].removeprefix('sqlite:///')
+        return str(profile_directory(profile, self.app) / DATABASE_FILENAME)
+
+    def exists(self, profile):
+        return profile == DEFAULT_PROFILE or Path(self.database_path(profile)).exists()
+
+    def names(self):
+        profiles_dir = Path(self.app.config['PROFILES_DIR'])
+        named = sorted(path.parent.name for path in profiles_dir.glob(f'*/{DATABASE_FILENAME}')
+                       if PROFILE_NAME.match(path.parent.name))
+        return [DEFAULT_PROFILE] + [name for name in named if name != DEFAULT_PROFILE]
+
+    def get(self, profile):
+        """Engine for a named profile, creating its database and schema on first use"""
+        engine = self._engines.get(profile)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            if profile not in self._engines:
+                profile_directory(profile, self.app).mkdir(parents=True, exist_ok=True)
+                path = self.database_path(profile)
+                engine = sa.create_engine(f'sqlite:///{path}',
+                                          **{**self.app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+                                             **engine_options(self.app, profile, path)})
+                init_database(engine)
+                instrument_engine(self.app, engine)
+                self._engines[profile] = engine
+            return self._engines[profile]
+
+
+def init_database(engine):
+    """Create tables plus the raw-SQL schema objects (triggers, FTS) on an engine"""
+    from . import db
+    from .schema import init_schema
+
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        init_schema(connection)
+
+
+def get_registry(app=None):
+    return (app or current_app).extensions['chronocop_profiles']
+
+
+class ProfileSession(Session):
+    """db.session that binds to the current request's profile"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            profile = current_profile()
+            if profile != DEFAULT_PROFILE:
+                return get_registry().get(profile)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def profile_engine(profile=None):
+    """Engine backing a profile (the current request's by default)"""
+    from . import db
+
+    profile = profile or current_profile()
+    if profile == DEFAULT_PROFILE:
+        return db.engine
+    return get_registry().get(profile)
+
+
+def _select_profile():
+    profile = request.headers.get(PROFILE_HEADER) or request.args.get('profile') or DEFAULT_PROFILE
+    if not PROFILE_NAME.match(profile):
+        return jsonify({'error': 'Invalid profile name'}), 400
+    # Named profiles have to be created through POST /api/profiles first
+    if not get_registry().exists(profile):
+        return jsonify({'error': f'Profile not found: {profile}'}), 404
+    g.profile = profile
+
+
+def init_profiles(app):
+    """Attach the engine registry and per-request profile selection"""
+    app.extensions['chronocop_profiles'] = EngineRegistry(app)
+    app.before_request(_select_profile)
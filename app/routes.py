@@ -1,9 +1,22 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, Response, current_app, request, jsonify, render_template
 from datetime import datetime, timedelta
-from .models import TimeEntry, AppSettings, DailySummary, WeeklySummary
+from .models import (Activity, TimeEntry, EntryChange, AppSettings, DailySummary, WeeklySummary,
+                     WeekTemplate, CONFLICT_POLICIES)
 from . import db
+from .metrics import metrics, is_enabled as metrics_enabled
+from .summaries import get_summary_provider, post_to_claude
+from .profiles import PROFILE_NAME, current_profile, get_registry
+from .backup import BACKUP_KINDS, create_backup, list_backups
+from .storage import get_storage
+from . import archive, events, profiler
+from .singleflight import summary_flights
+from sqlalchemy import text, tuple_
+from sqlalchemy.exc import IntegrityError
 import requests
+import base64
+import binascii
 import json
+import re
 
 main = Blueprint('main', __name__)
 
@@ -11,9 +24,26 @@ main = Blueprint('main', __name__)
 def index():
     return render_template('index.html')
 
+def encode_entry_cursor(entry):
+    """Opaque keyset cursor pointing just past an entry dict's (date, start_time)"""
+    key = f"{entry['date']}|{entry['start_time']}"
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+def decode_entry_cursor(cursor):
+    """Inverse of encode_entry_cursor; raises ValueError on anything malformed"""
+    try:
+        key = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date_str, time_str = key.split('|')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    return datetime.strptime(date_str, '%Y-%m-%d').date(), datetime.strptime(time_str, '%H:%M').time()
+
 @main.route('/api/entries', methods=['GET'])
 def get_entries():
-    """Get time entries for a specific week"""
+    """Get time entries for a specific week, or a page of an arbitrary date range"""
+    if any(param in request.args for param in ('from', 'to', 'limit', 'cursor')):
+        return get_entries_range()
+    
     week_start = request.args.get('week_start')
     
     if week_start:
@@ -35,7 +65,50 @@ def get_entries():
         TimeEntry.date <= end_date
     ).order_by(TimeEntry.date, TimeEntry.start_time).all()
     
-    return jsonify([entry.to_dict() for entry in entries])
+    entries = [entry.to_dict() for entry in entries]
+    return jsonify(archive.merge_entries(entries, archive.query_entries(start_date, end_date)))
+
+def get_entries_range():
+    """Page through entries between from/to (inclusive) in (date, start_time) order"""
+    try:
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 500)), 1), 2000)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    query = TimeEntry.query
+    if date_from:
+        query = query.filter(TimeEntry.date >= date_from)
+    if date_to:
+        query = query.filter(TimeEntry.date <= date_to)
+    
+    cursor = request.args.get('cursor')
+    after = None
+    if cursor:
+        try:
+            after = decode_entry_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        # Keyset condition; served by the unique (date, start_time) index
+        query = query.filter(tuple_(TimeEntry.date, TimeEntry.start_time) > after)
+    
+    entries = query.order_by(TimeEntry.date, TimeEntry.start_time).limit(limit + 1).all()
+    entries = archive.merge_entries([entry.to_dict() for entry in entries],
+                                    archive.query_entries(date_from, date_to, after, limit + 1))
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    
+    return jsonify({
+        'entries': entries,
+        'next_cursor': encode_entry_cursor(entries[-1]) if has_more else None
+    })
 
 @main.route('/api/entries', methods=['POST'])
 def create_entry():
@@ -71,6 +144,10 @@ def create_entry():
         date_obj = datetime.strptime(data['date'], '%Y-%m-%d').date()
         time_obj = datetime.strptime(data['start_time'], '%H:%M').time()
         
+        archived_before = archive.archived_before()
+        if archived_before and date_obj < archived_before:
+            return jsonify({'error': f'Entries before {archived_before} are archived and read-only'}), 409
+        
         # Check for conflicts
         existing_entry = TimeEntry.query.filter_by(
             date=date_obj,
@@ -92,6 +169,7 @@ def create_entry():
         db.session.add(entry)
         db.session.commit()
         
+        events.publish('entry.created', entry.to_dict())
         return jsonify(entry.to_dict()), 201
         
     except ValueError as e:
@@ -135,6 +213,10 @@ def update_entry(entry_id):
         date_obj = datetime.strptime(data['date'], '%Y-%m-%d').date()
         time_obj = datetime.strptime(data['start_time'], '%H:%M').time()
         
+        archived_before = archive.archived_before()
+        if archived_before and date_obj < archived_before:
+            return jsonify({'error': f'Entries before {archived_before} are archived and read-only'}), 409
+        
         # Check for conflicts (excluding current entry)
         existing_entry = TimeEntry.query.filter(
             TimeEntry.date == date_obj,
@@ -160,6 +242,7 @@ def update_entry(entry_id):
         
         db.session.commit()
         
+        events.publish('entry.updated', entry.to_dict())
         return jsonify(entry.to_dict())
         
     except ValueError as e:
@@ -172,15 +255,437 @@ def update_entry(entry_id):
 def delete_entry(entry_id):
     """Delete a time entry"""
     entry = TimeEntry.query.get_or_404(entry_id)
+    deleted = {'id': entry.id, 'date': entry.date.isoformat(), 'start_time': entry.start_time.strftime('%H:%M')}
     
     try:
         db.session.delete(entry)
         db.session.commit()
+        events.publish('entry.deleted', deleted)
         return '', 204
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to delete entry'}), 500
 
+# Week copy and template API routes
+def parse_monday(date_str):
+    """Monday of the week containing a YYYY-MM-DD date; raises ValueError"""
+    date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+    return date_obj - timedelta(days=date_obj.weekday())
+
+def requested_conflict_policy(data):
+    on_conflict = data.get('on_conflict', 'skip')
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f'on_conflict must be one of: {CONFLICT_POLICIES}')
+    return on_conflict
+
+def check_writable(first_date):
+    """Error response if first_date falls in the archived (read-only) period"""
+    archived_before = archive.archived_before()
+    if archived_before and first_date < archived_before:
+        return jsonify({'error': f'Entries before {archived_before} are archived and read-only'}), 409
+    return None
+
+def check_not_archived(first_date, what):
+    """Error response if a read that only sees the hot database would start in the archived period"""
+    archived_before = archive.archived_before()
+    if archived_before and first_date < archived_before:
+        return jsonify({'error': f'{what} is archived (everything before {archived_before} is read-only)'}), 409
+    return None
+
+def bulk_write(write, date_from, date_to):
+    """Run a bulk entry write over date_from..date_to, mapping a 'fail' policy conflict to 409"""
+    try:
+        result = write()
+        events.publish('entries.bulk', {'from': date_from.isoformat(), 'to': date_to.isoformat(), **result})
+        return jsonify(result)
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Time slot already occupied'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to write entries: {str(e)}'}), 500
+
+@main.route('/api/weeks/<date>/copy', methods=['POST'])
+def copy_week(date):
+    """Copy every entry of one week onto another week"""
+    data = request.get_json() or {}
+    
+    if not data.get('target_week_start'):
+        return jsonify({'error': 'Missing required field: target_week_start'}), 400
+    
+    try:
+        source_start = parse_monday(date)
+        target_start = parse_monday(data['target_week_start'])
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    try:
+        on_conflict = requested_conflict_policy(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if source_start == target_start:
+        return jsonify({'error': 'Source and target are the same week'}), 400
+    
+    error = check_not_archived(source_start, 'Source week') or check_writable(target_start)
+    if error:
+        return error
+    
+    return bulk_write(lambda: TimeEntry.copy_week(source_start, target_start, on_conflict),
+                      target_start, target_start + timedelta(days=6))
+
+@main.route('/api/templates', methods=['GET'])
+def get_templates():
+    """List saved week templates"""
+    return jsonify([template.to_dict() for template in WeekTemplate.query.order_by(WeekTemplate.name).all()])
+
+@main.route('/api/templates', methods=['POST'])
+def create_template():
+    """Save a week's entries as a named template"""
+    data = request.get_json() or {}
+    
+    name = data.get('name')
+    if name is not None and not isinstance(name, str):
+        return jsonify({'error': 'Template name must be a string'}), 400
+    
+    name = (name or '').strip()
+    if not name:
+        return jsonify({'error': 'Missing required field: name'}), 400
+    if not data.get('week_start'):
+        return jsonify({'error': 'Missing required field: week_start'}), 400
+    if len(name) > 100:
+        return jsonify({'error': 'Template name must be 100 characters or less'}), 400
+    
+    try:
+        week_start = parse_monday(data['week_start'])
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    error = check_not_archived(week_start, 'Week')
+    if error:
+        return error
+    
+    if WeekTemplate.query.filter_by(name=name).first():
+        return jsonify({'error': 'A template with this name already exists'}), 409
+    
+    try:
+        template = WeekTemplate.from_week(name, week_start)
+        return jsonify(template.to_dict(include_slots=True)), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create template'}), 500
+
+@main.route('/api/templates/<int:template_id>', methods=['GET'])
+def get_template(template_id):
+    """Get a template and its slots"""
+    return jsonify(WeekTemplate.query.get_or_404(template_id).to_dict(include_slots=True))
+
+@main.route('/api/templates/<int:template_id>', methods=['DELETE'])
+def delete_template(template_id):
+    """Delete a template"""
+    template = WeekTemplate.query.get_or_404(template_id)
+    
+    try:
+        db.session.delete(template)
+        db.session.commit()
+        return '', 204
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to delete template'}), 500
+
+@main.route('/api/templates/<int:template_id>/apply', methods=['POST'])
+def apply_template(template_id):
+    """Apply a template to every day in a date range"""
+    template = WeekTemplate.query.get_or_404(template_id)
+    data = request.get_json() or {}
+    
+    for field in ['from', 'to']:
+        if not data.get(field):
+            return jsonify({'error': f'Missing required field: {field}'}), 400
+    
+    try:
+        date_from = datetime.strptime(data['from'], '%Y-%m-%d').date()
+        date_to = datetime.strptime(data['to'], '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    try:
+        on_conflict = requested_conflict_policy(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if date_to < date_from:
+        return jsonify({'error': 'to must not be before from'}), 400
+    if (date_to - date_from).days >= 366:
+        return jsonify({'error': 'Templates can be applied to at most 366 days at once'}), 400
+    
+    error = check_writable(date_from)
+    if error:
+        return error
+    
+    return bulk_write(lambda: template.apply(date_from, date_to, on_conflict), date_from, date_to)
+
+@main.route('/api/changes', methods=['GET'])
+def get_changes():
+    """Get entries created, updated or deleted since a sync cursor"""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(max(int(request.args.get('limit', 1000)), 1), 5000)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+
+    latest_cursor = EntryChange.latest_cursor()
+    if since < 0 or since > latest_cursor:
+        # Cursor from another database or a reset one; the client must resync from 0
+        return jsonify({'error': 'Unknown cursor. Resync from since=0', 'cursor': latest_cursor}), 410
+
+    changes = EntryChange.query.filter(EntryChange.id > since).order_by(EntryChange.id).limit(limit + 1).all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    upserted_ids = [change.entry_id for change in changes if change.operation == 'upsert']
+    entries = TimeEntry.query.filter(TimeEntry.id.in_(upserted_ids)).all() if upserted_ids else []
+
+    return jsonify({
+        'entries': [entry.to_dict() for entry in entries],
+        'deleted': [change.entry_id for change in changes if change.operation == 'delete'],
+        'cursor': changes[-1].id if has_more else max([latest_cursor] + [change.id for change in changes[-1:]]),
+        'has_more': has_more
+    })
+
+
+# Search and autocomplete API routes
+def build_fts_query(query):
+    """Turn free text into a safe FTS5 MATCH expression (all terms, prefix-matched)"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+@main.route('/api/search', methods=['GET'])
+def search_entries():
+    """Full-text search over activity history, best matches first"""
+    match_query = build_fts_query(request.args.get('q', ''))
+    if not match_query:
+        return jsonify({'error': 'Missing search query: q'}), 400
+
+    try:
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    filters = ''
+    params = {'query': match_query, 'limit': limit}
+    if date_from:
+        filters += ' AND e.date >= :date_from'
+        params['date_from'] = date_from.isoformat()
+    if date_to:
+        filters += ' AND e.date <= :date_to'
+        params['date_to'] = date_to.isoformat()
+
+    # bm25() is lower-is-better; entries sharing an activity go most recent first
+    rows = db.session.execute(text(f"""
+        SELECT e.id,
+               snippet(activities_fts, 0, '**', '**', '…', 12) AS snippet,
+               bm25(activities_fts) AS rank
+        FROM activities_fts
+        JOIN time_entries e ON e.activity_id = activities_fts.rowid
+        WHERE activities_fts MATCH :query{filters}
+        ORDER BY rank, e.date DESC, e.start_time DESC
+        LIMIT :limit
+    """), params).all()
+
+    entries = {}
+    if rows:
+        ids = [row.id for row in rows]
+        entries = {entry.id: entry for entry in TimeEntry.query.filter(TimeEntry.id.in_(ids))}
+
+    ranked = []
+    for row in rows:
+        result = entries[row.id].to_dict()
+        result['snippet'] = row.snippet
+        ranked.append((row.rank, result))
+
+    # Archived entries keep their activity names inline; rank them by the same
+    # activity index, which still holds every name ever used
+    if archive.archive_paths():
+        matches = db.session.execute(text("""
+            SELECT a.name, snippet(activities_fts, 0, '**', '**', '…', 12) AS snippet,
+                   bm25(activities_fts) AS rank
+            FROM activities_fts JOIN activities a ON a.id = activities_fts.rowid
+            WHERE activities_fts MATCH :query
+        """), {'query': match_query}).all()
+        snippets = {match.name: match.snippet for match in matches}
+        for rank, entry in archive.search_entries({match.name: match.rank for match in matches},
+                                                  date_from, date_to, limit):
+            ranked.append((rank, {**entry, 'snippet': snippets[entry['activity']]}))
+        ranked.sort(key=lambda item: (item[1]['date'], item[1]['start_time']), reverse=True)
+        ranked.sort(key=lambda item: item[0])
+
+    results = [{**result, 'score': round(-rank, 4)} for rank, result in ranked[:limit]]
+    return jsonify({'query': request.args.get('q'), 'results': results})
+
+@main.route('/api/activities', methods=['GET'])
+def suggest_activities():
+    """Autocomplete activity names by prefix, most used first"""
+    prefix = request.args.get('prefix', '').strip()
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    return jsonify([activity.to_dict() for activity in Activity.suggest(prefix, limit)])
+
+
+# Profiles API routes
+@main.route('/api/profiles', methods=['GET'])
+def get_profiles():
+    """List profiles and the database file behind each"""
+    registry = get_registry()
+    return jsonify([{'name': name, 'database': registry.database_path(name), 'current': name == current_profile()}
+                    for name in registry.names()])
+
+@main.route('/api/profiles', methods=['POST'])
+def create_profile():
+    """Create a named profile with its own database"""
+    data = request.get_json() or {}
+    name = str(data.get('name', '')).strip()
+    
+    if not PROFILE_NAME.match(name):
+        return jsonify({'error': 'Profile names are 1-40 lowercase letters, digits, - or _'}), 400
+    
+    registry = get_registry()
+    if registry.exists(name):
+        return jsonify({'error': f'Profile already exists: {name}'}), 409
+    
+    try:
+        registry.get(name)
+    except Exception as e:
+        return jsonify({'error': f'Failed to create profile: {str(e)}'}), 500
+    
+    return jsonify({'name': name, 'database': registry.database_path(name)}), 201
+
+
+# Backup API routes
+@main.route('/api/backups', methods=['GET'])
+def get_backups():
+    """List the current profile's backups, newest first"""
+    return jsonify(list_backups())
+
+@main.route('/api/backups', methods=['POST'])
+def backup_now():
+    """Take an online snapshot (or a compacted VACUUM INTO copy) of the current profile"""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind', 'snapshot')
+    
+    if kind not in BACKUP_KINDS:
+        return jsonify({'error': f"kind must be one of: {', '.join(BACKUP_KINDS)}"}), 400
+    
+    try:
+        return jsonify(create_backup(kind=kind)), 201
+    except Exception as e:
+        return jsonify({'error': f'Backup failed: {str(e)}'}), 500
+
+
+# Storage API routes
+@main.route('/api/storage', methods=['GET'])
+def get_storage_status():
+    """Storage mode, flush interval and the state of each in-memory profile"""
+    storage = get_storage()
+    return jsonify({
+        'mode': current_app.config['STORAGE_MODE'],
+        'flush_interval_seconds': storage.interval if storage else None,
+        'profiles': {profile: store.info() for profile, store in storage.stores().items()} if storage else {}
+    })
+
+@main.route('/api/storage/flush', methods=['POST'])
+def flush_storage():
+    """Write every in-memory profile with pending changes back to its file now"""
+    storage = get_storage()
+    if storage is None:
+        # Disk mode: every commit is already on disk
+        return jsonify({'mode': current_app.config['STORAGE_MODE'], 'flushed': []})
+    return jsonify({'mode': current_app.config['STORAGE_MODE'], 'flushed': storage.flush_all()})
+
+
+# Archive API routes
+@main.route('/api/archive', methods=['GET'])
+def get_archives():
+    """List the current profile's per-year archives"""
+    return jsonify(archive.list_archives())
+
+@main.route('/api/archive', methods=['POST'])
+def archive_now():
+    """Move entries and summaries older than older_than_days into the archives"""
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        older_than_days = int(data.get('older_than_days', current_app.config['ARCHIVE_AFTER_DAYS']))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'older_than_days must be an integer'}), 400
+    if older_than_days < 1:
+        return jsonify({'error': 'older_than_days must be at least 1'}), 400
+    
+    try:
+        result = archive.archive_old_data(older_than_days, vacuum=data.get('vacuum', True))
+        if result['archives']:
+            events.publish('entries.archived', {'cutoff': result['cutoff']})
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': f'Archiving failed: {str(e)}'}), 500
+
+
+# Live change notifications
+@main.route('/api/events', methods=['GET'])
+def event_stream():
+    """Server-Sent Events stream of the current profile's changes"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+    
+    return Response(
+        events.stream(current_profile(), last_event_id, current_app.config['EVENTS_HEARTBEAT_SECONDS']),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# Instrumentation (opt-in via CHRONOCOP_METRICS=1)
+@main.route('/api/_metrics', methods=['GET'])
+def get_metrics():
+    """Latency histograms per route, SQL and external call timings"""
+    if not metrics_enabled():
+        return jsonify({'error': 'Metrics are disabled. Start with CHRONOCOP_METRICS=1'}), 404
+    return jsonify(metrics.snapshot())
+
+@main.route('/api/_profiler', methods=['GET'])
+def get_profiler():
+    """Armed request count and the profiles written so far"""
+    if not profiler.is_enabled():
+        return jsonify({'error': 'Profiler is disabled. Start with CHRONOCOP_PROFILER=1'}), 404
+    return jsonify({'armed': profiler.armed(), 'profiles': profiler.list_dumps()})
+
+@main.route('/api/_profiler', methods=['POST'])
+def arm_profiler():
+    """Profile the next `count` requests"""
+    if not profiler.is_enabled():
+        return jsonify({'error': 'Profiler is disabled. Start with CHRONOCOP_PROFILER=1'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    count = data.get('count', 1)
+    if not isinstance(count, int) or isinstance(count, bool) or not 0 <= count <= 100:
+        return jsonify({'error': 'count must be an integer between 0 and 100'}), 400
+    return jsonify({'armed': profiler.arm(count)})
+
 
 # Settings API routes
 @main.route('/api/settings', methods=['GET'])
@@ -207,6 +712,8 @@ def set_setting(key):
     
     try:
         setting = AppSettings.set_setting(key, data['value'])
+        # Key only: values can be secrets (claude_api_key)
+        events.publish('setting.updated', {'key': key})
         return jsonify(setting.to_dict())
     except Exception as e:
         db.session.rollback()
@@ -222,6 +729,7 @@ def delete_setting(key):
     try:
         db.session.delete(setting)
         db.session.commit()
+        events.publish('setting.deleted', {'key': key})
         return '', 204
     except Exception as e:
         db.session.rollback()
@@ -243,24 +751,13 @@ def test_claude_connection():
     
     try:
         # Test with a simple prompt
-        headers = {
-            'Content-Type': 'application/json',
-            'x-api-key': api_key,
-            'anthropic-version': '2023-06-01'
-        }
-        
         payload = {
             'model': 'claude-3-haiku-20240307',
             'max_tokens': 50,
             'messages': [{ 'role': 'user', 'content': 'Say "Connection test successful"' }]
         }
         
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
+        response = post_to_claude(api_key, payload, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -295,14 +792,23 @@ def test_claude_connection():
 
 
 # Daily Summary API routes
+def requested_summary_provider():
+    """Provider named by ?provider= or the JSON body, else the summary_provider setting"""
+    data = request.get_json(silent=True) or {}
+    return (request.args.get('provider') or data.get('provider')
+            or AppSettings.get_setting('summary_provider', 'claude'))
+
 @main.route('/api/summaries/<date>', methods=['GET'])
 def get_daily_summary(date):
     """Get daily summary for a specific date"""
     try:
         summary = DailySummary.get_summary(date)
-        if not summary:
+        if summary:
+            return jsonify(summary.to_dict())
+        archived = archive.get_daily_summary(datetime.strptime(date, '%Y-%m-%d').date())
+        if not archived:
             return jsonify({'error': 'Summary not found'}), 404
-        return jsonify(summary.to_dict())
+        return jsonify(archived)
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
@@ -312,33 +818,39 @@ def generate_daily_summary(date):
     try:
         date_obj = datetime.strptime(date, '%Y-%m-%d').date()
         
+        # Archived days keep whatever summary they had when they were archived
+        error = check_not_archived(date_obj, 'This day')
+        if error:
+            return error
+        
         # Get entries for the date
         entries = TimeEntry.query.filter_by(date=date_obj).order_by(TimeEntry.start_time).all()
         
         if not entries:
             return jsonify({'error': 'No entries found for this date'}), 404
         
-        # Check if Claude API token is configured
-        claude_api_key = AppSettings.get_setting('claude_api_key')
-        if not claude_api_key:
-            return jsonify({'error': 'Claude API key not configured. Please set it in Settings.'}), 400
+        # Pick the summary backend (Claude unless the request or settings say otherwise)
+        try:
+            provider = get_summary_provider(requested_summary_provider())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def generate():
+            summary_text, token_count, usage = provider.daily_summary(entries)
+            summary = DailySummary.create_summary(date_obj, summary_text, token_count, **usage).to_dict()
+            events.publish('summary.daily', summary)
+            return summary
         
-        # Generate summary using Claude API
+        # Generate summary with the selected provider; concurrent requests for
+        # the same day and provider wait for one generation and share it
         try:
-            summary_text, token_count = generate_claude_summary(entries, claude_api_key)
-            
-            # Check if summary already exists and delete it to regenerate
-            existing_summary = DailySummary.get_summary(date_obj)
-            if existing_summary:
-                db.session.delete(existing_summary)
-                db.session.commit()
-            
-            # Save the new summary
-            summary = DailySummary.create_summary(date_obj, summary_text, token_count)
+            summary, shared = summary_flights.do(('daily', current_profile(), date_obj, provider.name), generate)
             
             return jsonify({
                 'message': 'Summary generated successfully',
-                'summary': summary.to_dict()
+                'provider': provider.name,
+                'shared': shared,
+                'summary': summary
             })
             
         except Exception as e:
@@ -350,107 +862,6 @@ def generate_daily_summary(date):
     except Exception as e:
         return jsonify({'error': f'Failed to generate summary: {str(e)}'}), 500
 
-def generate_claude_summary(entries, api_key):
-    """Generate summary using Claude API with enhanced analysis"""
-    
-    # Calculate statistics for richer context
-    total_minutes = sum((entry.end_time.hour * 60 + entry.end_time.minute) - 
-                       (entry.start_time.hour * 60 + entry.start_time.minute) for entry in entries)
-    total_hours = total_minutes / 60
-    
-    planned_count = sum(1 for entry in entries if entry.type == 'planned')
-    reactive_count = sum(1 for entry in entries if entry.type == 'reactive')
-    
-    energy_counts = {}
-    for entry in entries:
-        energy_counts[entry.energy_impact] = energy_counts.get(entry.energy_impact, 0) + 1
-    
-    # Prepare the activity data for Claude with enhanced context
-    activities_text = ""
-    for entry in entries:
-        duration_mins = (entry.end_time.hour * 60 + entry.end_time.minute) - (entry.start_time.hour * 60 + entry.start_time.minute)
-        activities_text += f"• {entry.start_time.strftime('%H:%M')}-{entry.end_time.strftime('%H:%M')} ({duration_mins}min): {entry.activity} [{entry.type}, {entry.energy_impact}]\n"
-    
-    # Create enhanced prompt with examples and better structure
-    prompt = f"""You are an expert productivity analyst. Analyze this time tracking data to create a professional daily summary that provides actionable insights.
-
-**TIME TRACKING DATA:**
-{activities_text}
-
-**STATISTICAL CONTEXT:**
-• Total tracked time: {total_hours:.1f} hours
-• Work style: {planned_count} planned vs {reactive_count} reactive activities
-• Energy distribution: {', '.join(f'{k}: {v}' for k, v in energy_counts.items())}
-
-**ANALYSIS FRAMEWORK:**
-Create a structured summary that identifies patterns, productivity insights, and strategic recommendations. This should be valuable for both personal reflection and professional communication.
-
-**REQUIRED FORMAT:**
-
-• **Key Accomplishments**
-  - List 2-3 most significant outcomes/deliverables completed
-  - Focus on impact and value created, not just tasks done
-
-• **Energy & Focus Patterns** 
-  - Identify peak performance periods and energy trends
-  - Note any productivity bottlenecks or flow states
-  - Connect energy levels to activity types and timing
-
-• **Work Style Analysis**
-  - Analyze planned vs reactive work balance and effectiveness
-  - Assess time allocation across different activity categories
-  - Identify any workflow optimization opportunities
-
-• **Tomorrow's Strategic Focus**
-  - Provide 2-3 specific, actionable recommendations
-  - Base suggestions on observed patterns and energy management
-  - Include timing recommendations for optimal productivity
-
-**QUALITY STANDARDS:**
-- Keep concise but insightful (target ~150-200 words)
-- Use professional yet approachable tone
-- Focus on actionable insights over mere description
-- Ensure recommendations are specific and implementable
-
-Generate a summary that demonstrates clear analytical thinking and provides genuine strategic value."""
-
-    # Claude API request with upgraded model
-    headers = {
-        'Content-Type': 'application/json',
-        'x-api-key': api_key,
-        'anthropic-version': '2023-06-01'
-    }
-    
-    data = {
-        'model': 'claude-3-5-sonnet-20241022',  # Upgraded to Claude 3.5 Sonnet for much better analysis
-        'max_tokens': 400,  # Increased for more detailed insights
-        'messages': [
-            {
-                'role': 'user',
-                'content': prompt
-            }
-        ]
-    }
-    
-    response = requests.post(
-        'https://api.anthropic.com/v1/messages',
-        headers=headers,
-        json=data,
-        timeout=30
-    )
-    
-    if response.status_code != 200:
-        raise Exception(f"Claude API error: {response.status_code} - {response.text}")
-    
-    result = response.json()
-    
-    # Extract the summary text and token usage
-    summary_text = result['content'][0]['text']
-    token_count = result.get('usage', {}).get('output_tokens', 0)
-    
-    return summary_text, token_count
-
-
 # Weekly Summary API routes
 @main.route('/api/weekly-summaries/<date>', methods=['GET'])
 def get_weekly_summary(date):
@@ -463,9 +874,12 @@ def get_weekly_summary(date):
         monday_date = date_obj - timedelta(days=days_since_monday)
         
         summary = WeeklySummary.get_summary(monday_date)
-        if not summary:
+        if summary:
+            return jsonify(summary.to_dict())
+        archived = archive.get_weekly_summary(monday_date)
+        if not archived:
             return jsonify({'error': 'Weekly summary not found'}), 404
-        return jsonify(summary.to_dict())
+        return jsonify(archived)
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
@@ -480,6 +894,10 @@ def generate_weekly_summary(date):
         monday_date = date_obj - timedelta(days=days_since_monday)
         sunday_date = monday_date + timedelta(days=6)
         
+        error = check_not_archived(monday_date, 'This week')
+        if error:
+            return error
+        
         # Get all entries for the week
         entries = TimeEntry.query.filter(
             TimeEntry.date >= monday_date,
@@ -489,27 +907,28 @@ def generate_weekly_summary(date):
         if not entries:
             return jsonify({'error': 'No entries found for this week'}), 404
         
-        # Check if Claude API token is configured
-        claude_api_key = AppSettings.get_setting('claude_api_key')
-        if not claude_api_key:
-            return jsonify({'error': 'Claude API key not configured. Please set it in Settings.'}), 400
+        # Pick the summary backend (Claude unless the request or settings say otherwise)
+        try:
+            provider = get_summary_provider(requested_summary_provider())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def generate():
+            summary_text, token_count, usage = provider.weekly_summary(entries)
+            summary = WeeklySummary.create_summary(monday_date, summary_text, token_count, **usage).to_dict()
+            events.publish('summary.weekly', summary)
+            return summary
         
-        # Generate weekly summary using Claude API
+        # Generate weekly summary with the selected provider, shared with any
+        # concurrent request for the same week and provider
         try:
-            summary_text, token_count = generate_claude_weekly_summary(entries, claude_api_key)
-            
-            # Check if summary already exists and delete it to regenerate
-            existing_summary = WeeklySummary.get_summary(monday_date)
-            if existing_summary:
-                db.session.delete(existing_summary)
-                db.session.commit()
-            
-            # Save the new weekly summary
-            summary = WeeklySummary.create_summary(monday_date, summary_text, token_count)
+            summary, shared = summary_flights.do(('weekly', current_profile(), monday_date, provider.name), generate)
             
             return jsonify({
                 'message': 'Weekly summary generated successfully',
-                'summary': summary.to_dict()
+                'provider': provider.name,
+                'shared': shared,
+                'summary': summary
             })
             
         except Exception as e:
@@ -520,144 +939,3 @@ def generate_weekly_summary(date):
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to generate weekly summary: {str(e)}'}), 500
-
-def generate_claude_weekly_summary(entries, api_key):
-    """Generate weekly summary using Claude API with enhanced analysis"""
-    
-    # Calculate comprehensive statistics
-    total_minutes = sum((entry.end_time.hour * 60 + entry.end_time.minute) - 
-                       (entry.start_time.hour * 60 + entry.start_time.minute) for entry in entries)
-    total_hours = total_minutes / 60
-    
-    planned_count = sum(1 for entry in entries if entry.type == 'planned')
-    reactive_count = sum(1 for entry in entries if entry.type == 'reactive')
-    
-    energy_distribution = {}
-    for entry in entries:
-        energy_distribution[entry.energy_impact] = energy_distribution.get(entry.energy_impact, 0) + 1
-    
-    # Group entries by day with statistics
-    days_data = {}
-    daily_stats = {}
-    for entry in entries:
-        day_name = entry.date.strftime('%A')
-        if day_name not in days_data:
-            days_data[day_name] = []
-            daily_stats[day_name] = {'planned': 0, 'reactive': 0, 'total_mins': 0}
-        
-        days_data[day_name].append(entry)
-        daily_stats[day_name][entry.type] += 1
-        duration = (entry.end_time.hour * 60 + entry.end_time.minute) - (entry.start_time.hour * 60 + entry.start_time.minute)
-        daily_stats[day_name]['total_mins'] += duration
-    
-    # Prepare enhanced weekly activity data for Claude
-    weekly_text = ""
-    active_days = len(days_data)
-    
-    for day_name in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']:
-        if day_name in days_data:
-            day_hours = daily_stats[day_name]['total_mins'] / 60
-            weekly_text += f"\n**{day_name}** ({day_hours:.1f}h tracked):\n"
-            for entry in days_data[day_name]:
-                duration_mins = (entry.end_time.hour * 60 + entry.end_time.minute) - (entry.start_time.hour * 60 + entry.start_time.minute)
-                weekly_text += f"• {entry.start_time.strftime('%H:%M')}-{entry.end_time.strftime('%H:%M')} ({duration_mins}min): {entry.activity} [{entry.type}, {entry.energy_impact}]\n"
-        else:
-            weekly_text += f"\n**{day_name}:** No tracked activities\n"
-    
-    # Create enhanced prompt with sophisticated analysis framework
-    prompt = f"""You are a senior productivity strategist analyzing weekly performance data. Generate a comprehensive strategic summary that provides deep insights for executive-level review and strategic planning.
-
-**WEEKLY TIME TRACKING DATA:**
-{weekly_text}
-
-**PERFORMANCE METRICS:**
-• Total tracked time: {total_hours:.1f} hours across {active_days} active days
-• Work approach: {planned_count} planned vs {reactive_count} reactive activities ({(planned_count/(planned_count+reactive_count)*100):.0f}% planned)
-• Energy distribution: {', '.join(f'{k}: {v}' for k, v in energy_distribution.items())}
-• Average daily engagement: {total_hours/7:.1f} hours per day
-
-**STRATEGIC ANALYSIS FRAMEWORK:**
-Provide a comprehensive weekly assessment that identifies trends, strategic insights, and forward-looking recommendations suitable for leadership review and strategic planning.
-
-**REQUIRED SECTIONS:**
-
-• **Executive Summary**
-  - High-level strategic overview of the week's productivity themes
-  - Key patterns in work approach and energy management
-  - Overall strategic positioning and focus areas
-
-• **Strategic Accomplishments**
-  - Major deliverables and strategic outcomes achieved
-  - Value creation and impact assessment
-  - Progress toward larger objectives and initiatives
-
-• **Productivity Intelligence**
-  - Deep analysis of peak performance patterns and optimal working conditions
-  - Energy management insights and flow state identification
-  - Work style effectiveness and strategic work allocation
-
-• **Operational Insights**
-  - Assessment of planned vs reactive work balance and strategic implications
-  - Time allocation analysis across different activity categories
-  - Workflow optimization opportunities and operational improvements
-
-• **Daily Performance Highlights**
-  - Strategic insights from each productive day
-  - Notable patterns, breakthroughs, or learning moments
-  - Day-specific observations that inform future planning
-
-• **Strategic Development Areas**
-  - Specific opportunities for enhanced productivity and strategic focus
-  - Systems and process improvements identified
-  - Professional development and capability building insights
-
-• **Next Week's Strategic Priorities**
-  - Forward-looking strategic recommendations based on observed patterns
-  - Optimal scheduling and energy management strategies
-  - Key focus areas and strategic objectives for maximum impact
-
-**QUALITY EXPECTATIONS:**
-- Demonstrate sophisticated analytical thinking and strategic perspective
-- Provide actionable insights suitable for executive decision-making
-- Balance comprehensive analysis with clear, decisive recommendations
-- Target 400-500 words for thorough strategic coverage
-- Use professional executive communication style
-- Focus on strategic value and forward-looking insights
-
-Generate a summary that demonstrates exceptional strategic thinking and provides genuine leadership-level insights for high-performance optimization."""
-
-    # Claude API request for weekly summary with premium model
-    headers = {
-        'Content-Type': 'application/json',
-        'x-api-key': api_key,
-        'anthropic-version': '2023-06-01'
-    }
-    
-    data = {
-        'model': 'claude-3-5-sonnet-20241022',  # Upgraded to Claude 3.5 Sonnet for strategic-level analysis
-        'max_tokens': 800,  # Increased for comprehensive strategic analysis
-        'messages': [
-            {
-                'role': 'user',
-                'content': prompt
-            }
-        ]
-    }
-    
-    response = requests.post(
-        'https://api.anthropic.com/v1/messages',
-        headers=headers,
-        json=data,
-        timeout=45  # Increased timeout for more complex analysis
-    )
-    
-    if response.status_code != 200:
-        raise Exception(f"Claude API error: {response.status_code} - {response.text}")
-    
-    result = response.json()
-    
-    # Extract the summary text and token usage
-    summary_text = result['content'][0]['text']
-    token_count = result.get('usage', {}).get('output_tokens', 0)
-    
-    return summary_text, token_count 
\ No newline at end of file
@@ -0,0 +1,162 @@
+from datetime import datetime
+from sqlalchemy import text
+
+# Full-text index over the interned activity names. It is an external-content
+# FTS5 table, so each name is stored once (in activities) and the triggers
+# below keep the index in sync on every write path, including raw SQL.
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS activities_fts USING fts5(
+        name,
+        content='activities',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activities_fts_ai AFTER INSERT ON activities BEGIN
+        INSERT INTO activities_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activities_fts_ad AFTER DELETE ON activities BEGIN
+        INSERT INTO activities_fts(activities_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activities_fts_au AFTER UPDATE OF name ON activities BEGIN
+        INSERT INTO activities_fts(activities_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO activities_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+# activities.usage_count is kept in step with time_entries by triggers rather
+# than in Python, so bulk INSERT ... SELECT paths can't leave it stale.
+USAGE_COUNT_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS activities_usage_ai AFTER INSERT ON time_entries BEGIN
+        UPDATE activities SET usage_count = usage_count + 1 WHERE id = new.activity_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activities_usage_ad AFTER DELETE ON time_entries BEGIN
+        UPDATE activities SET usage_count = usage_count - 1 WHERE id = old.activity_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activities_usage_au AFTER UPDATE OF activity_id ON time_entries
+    WHEN old.activity_id IS NOT new.activity_id BEGIN
+        UPDATE activities SET usage_count = usage_count - 1 WHERE id = old.activity_id;
+        UPDATE activities SET usage_count = usage_count + 1 WHERE id = new.activity_id;
+    END
+    """,
+]
+
+# Change log behind GET /api/changes. Each write replaces the entry's previous
+# log row, so the log stays one row per entry (live or tombstoned) and the
+# AUTOINCREMENT id doubles as a monotonically increasing sync cursor.
+CHANGE_LOG_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS entry_changes_ai AFTER INSERT ON time_entries BEGIN
+        DELETE FROM entry_changes WHERE entry_id = new.id;
+        INSERT INTO entry_changes(entry_id, operation) VALUES (new.id, 'upsert');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entry_changes_au AFTER UPDATE ON time_entries BEGIN
+        DELETE FROM entry_changes WHERE entry_id = new.id;
+        INSERT INTO entry_changes(entry_id, operation) VALUES (new.id, 'upsert');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entry_changes_ad AFTER DELETE ON time_entries BEGIN
+        DELETE FROM entry_changes WHERE entry_id = old.id;
+        INSERT INTO entry_changes(entry_id, operation) VALUES (old.id, 'delete');
+    END
+    """,
+]
+
+# Prompt-cache and latency columns added to both summary tables after release
+SUMMARY_USAGE_COLUMNS = ('cache_read_tokens', 'cache_creation_tokens', 'latency_ms')
+
+
+def _table_exists(connection, name):
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {'name': name}
+    ).first() is not None
+
+
+def _trigger_exists(connection, name):
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"), {'name': name}
+    ).first() is not None
+
+
+def _column_names(connection, table):
+    return {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+
+
+def _intern_legacy_activities(connection):
+    """Move the free-text time_entries.activity column onto activities.activity_id"""
+    from .models import Activity, TimeEntry
+
+    names = [row[0] for row in connection.execute(text("SELECT DISTINCT activity FROM time_entries"))]
+    if names:
+        now = datetime.utcnow()
+        connection.execute(
+            Activity.__table__.insert().prefix_with('OR IGNORE'),
+            [{'name': name, 'name_key': Activity.make_key(name), 'usage_count': 0, 'created_at': now}
+             for name in names]
+        )
+
+    # The old full-text index and its triggers point at the column being removed
+    connection.execute(text("DROP TABLE IF EXISTS time_entries_fts"))
+    for trigger in ('time_entries_fts_ai', 'time_entries_fts_ad', 'time_entries_fts_au'):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+
+    # SQLite can't swap a column in place, so rebuild the table
+    connection.execute(text("ALTER TABLE time_entries RENAME TO time_entries_legacy"))
+    TimeEntry.__table__.create(connection)
+    connection.execute(text("""
+        INSERT INTO time_entries (id, date, start_time, end_time, activity_id, type, energy_impact, created_at, updated_at)
+        SELECT l.id, l.date, l.start_time, l.end_time, a.id, l.type, l.energy_impact, l.created_at, l.updated_at
+        FROM time_entries_legacy l
+        JOIN activities a ON a.name = l.activity
+    """))
+    connection.execute(text("DROP TABLE time_entries_legacy"))
+    connection.execute(text("""
+        UPDATE activities
+        SET usage_count = (SELECT COUNT(*) FROM time_entries WHERE activity_id = activities.id)
+    """))
+
+
+def init_schema(connection):
+    """Upgrade older databases and create the SQLite objects db.create_all() doesn't manage"""
+    if 'activity' in _column_names(connection, 'time_entries'):
+        _intern_legacy_activities(connection)
+
+    for table in ('daily_summaries', 'weekly_summaries'):
+        existing = _column_names(connection, table)
+        for column in SUMMARY_USAGE_COLUMNS:
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER"))
+
+    index_existed = _table_exists(connection, 'activities_fts')
+    change_log_existed = _trigger_exists(connection, 'entry_changes_ai')
+
+    for statement in SEARCH_INDEX_DDL + USAGE_COUNT_DDL + CHANGE_LOG_DDL:
+        connection.execute(text(statement))
+
+    # Backfill the index from activities written before it existed
+    if not index_existed:
+        connection.execute(text("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')"))
+
+    # Seed the change log so a client syncing from cursor 0 sees existing entries
+    if not change_log_existed:
+        connection.execute(text("""
+            INSERT INTO entry_changes(entry_id, operation)
+            SELECT id, 'upsert' FROM time_entries
+            WHERE id NOT IN (SELECT entry_id FROM entry_changes)
+            ORDER BY date, start_time
+        """))
@@ -0,0 +1,56 @@
+"""Single-flight coalescing of duplicate in-progress work
+
+The first caller for a key runs the function; callers arriving with the same
+key while it runs wait for it and get the same result (or exception) instead
+of starting their own. Summary generation uses this so a double-clicked
+Generate button or a second window costs one upstream call, not two.
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent calls within this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run fn() unless a call for key is already in flight; returns (result, shared)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key before waking waiters: a call made after this one
+            # finished must do fresh work rather than reuse a stale result
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, call.waiters > 0
+
+
+summary_flights = SingleFlight()
@@ -3,6 +3,19 @@
 class TimeAuditAPI {
     constructor() {
         this.baseURL = '';
+        // Named profile from the page URL (?profile=alice), sent with every request
+        this.profile = new URLSearchParams(window.location.search).get('profile');
+        // Summary generations in progress, so a double click reuses the same request
+        this.pendingGenerations = new Map();
+    }
+
+    // Run request() once per key at a time; concurrent callers share its promise
+    shareRequest(key, request) {
+        if (!this.pendingGenerations.has(key)) {
+            const pending = request().finally(() => this.pendingGenerations.delete(key));
+            this.pendingGenerations.set(key, pending);
+        }
+        return this.pendingGenerations.get(key);
     }
 
     // Show loading overlay
@@ -37,11 +50,12 @@ class TimeAuditAPI {
     async makeRequest(url, options = {}) {
         try {
             const response = await fetch(url, {
+                ...options,
                 headers: {
                     'Content-Type': 'application/json',
+                    ...(this.profile ? { 'X-Chronocop-Profile': this.profile } : {}),
                     ...options.headers
-                },
-                ...options
+                }
             });
 
             if (!response.ok) {
@@ -123,6 +137,36 @@ class TimeAuditAPI {
         }
     }
 
+    // Live change notifications; handlers maps event types (entry.created, ...) to callbacks
+    subscribeToEvents(handlers) {
+        const url = this.profile ? `/api/events?profile=${encodeURIComponent(this.profile)}` : '/api/events';
+        const source = new EventSource(url);
+        Object.entries(handlers).forEach(([type, handler]) => {
+            source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+        });
+        return source;
+    }
+
+    // Profile API methods
+    async getProfiles() {
+        try {
+            return await this.makeRequest('/api/profiles');
+        } catch (error) {
+            this.handleError(error, 'Failed to load profiles');
+        }
+    }
+
+    async createProfile(name) {
+        try {
+            return await this.makeRequest('/api/profiles', {
+                method: 'POST',
+                body: JSON.stringify({ name })
+            });
+        } catch (error) {
+            this.handleError(error, 'Failed to create profile');
+        }
+    }
+
     // Settings API methods
     async getSettings() {
         try {
@@ -167,11 +211,13 @@ class TimeAuditAPI {
         }
     }
 
-    async generateDailySummary(date) {
+    async generateDailySummary(date, provider = null) {
         try {
-            return await this.makeRequest(`/api/summaries/${date}/generate`, {
-                method: 'POST'
-            });
+            return await this.shareRequest(`daily:${date}:${provider}`, () =>
+                this.makeRequest(`/api/summaries/${date}/generate`, {
+                    method: 'POST',
+                    body: JSON.stringify(provider ? { provider } : {})
+                }));
         } catch (error) {
             throw error;
         }
@@ -188,11 +234,13 @@ class TimeAuditAPI {
         }
     }
 
-    async generateWeeklySummary(weekStartDate) {
+    async generateWeeklySummary(weekStartDate, provider = null) {
         try {
-            return await this.makeRequest(`/api/weekly-summaries/${weekStartDate}/generate`, {
-                method: 'POST'
-            });
+            return await this.shareRequest(`weekly:${weekStartDate}:${provider}`, () =>
+                this.makeRequest(`/api/weekly-summaries/${weekStartDate}/generate`, {
+                    method: 'POST',
+                    body: JSON.stringify(provider ? { provider } : {})
+                }));
         } catch (error) {
             throw error;
         }
@@ -282,7 +330,8 @@ class SettingsManager {
             const response = await fetch('/api/test-claude', {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    ...(api.profile ? { 'X-Chronocop-Profile': api.profile } : {})
                 },
                 body: JSON.stringify({
                     api_key: claudeApiKey
@@ -328,6 +377,7 @@ class SummaryManager {
     bindEvents() {
         // Summary generation
         document.getElementById('generateSummaryBtn').addEventListener('click', () => this.generateSummary());
+        document.getElementById('generateLocalSummaryBtn').addEventListener('click', () => this.generateSummary('local'));
         
         // Copy summary to clipboard
         document.getElementById('copySummaryBtn').addEventListener('click', () => this.copySummaryToClipboard());
@@ -351,7 +401,7 @@ class SummaryManager {
         }
     }
 
-    async generateSummary() {
+    async generateSummary(provider = null) {
         if (!this.currentDate) {
             alert('No date selected');
             return;
@@ -362,16 +412,18 @@ class SummaryManager {
             window.calendar.playUISound('button');
         }
 
-        // Check if Claude API key is configured
-        try {
-            const claudeApiKey = await api.getSetting('claude_api_key');
-            if (!claudeApiKey || !claudeApiKey.value) {
+        // Check if Claude API key is configured (the local provider doesn't need one)
+        if (provider !== 'local') {
+            try {
+                const claudeApiKey = await api.getSetting('claude_api_key');
+                if (!claudeApiKey || !claudeApiKey.value) {
+                    alert('Please configure your Claude API key in Settings first.');
+                    return;
+                }
+            } catch (error) {
                 alert('Please configure your Claude API key in Settings first.');
                 return;
             }
-        } catch (error) {
-            alert('Please configure your Claude API key in Settings first.');
-            return;
         }
 
         // Show loading state (this will hide any existing summary)
@@ -379,7 +431,7 @@ class SummaryManager {
 
         try {
             // Always generate a fresh summary
-            const result = await api.generateDailySummary(this.currentDate);
+            const result = await api.generateDailySummary(this.currentDate, provider);
             if (result && result.summary) {
                 this.displaySummary(result.summary);
             } else {
@@ -544,6 +596,7 @@ class WeeklySummaryManager {
         // Modal handlers
         document.getElementById('closeWeeklySummaryModal').addEventListener('click', () => this.closeWeeklySummaryModal());
         document.getElementById('generateWeeklySummaryBtn').addEventListener('click', () => this.generateWeeklySummary());
+        document.getElementById('generateLocalWeeklySummaryBtn').addEventListener('click', () => this.generateWeeklySummary('local'));
         document.getElementById('copyWeeklySummaryBtn').addEventListener('click', () => this.copyWeeklySummaryToClipboard());
         
         // Close modal when clicking outside
@@ -603,7 +656,7 @@ class WeeklySummaryManager {
         }
     }
 
-    async generateWeeklySummary() {
+    async generateWeeklySummary(provider = null) {
         if (!this.currentWeekStart) {
             alert('No week selected');
             return;
@@ -614,16 +667,18 @@ class WeeklySummaryManager {
             window.calendar.playUISound('button');
         }
 
-        // Check if Claude API key is configured
-        try {
-            const claudeApiKey = await api.getSetting('claude_api_key');
-            if (!claudeApiKey || !claudeApiKey.value) {
+        // Check if Claude API key is configured (the local provider doesn't need one)
+        if (provider !== 'local') {
+            try {
+                const claudeApiKey = await api.getSetting('claude_api_key');
+                if (!claudeApiKey || !claudeApiKey.value) {
+                    alert('Please configure your Claude API key in Settings first.');
+                    return;
+                }
+            } catch (error) {
                 alert('Please configure your Claude API key in Settings first.');
                 return;
             }
-        } catch (error) {
-            alert('Please configure your Claude API key in Settings first.');
-            return;
         }
 
         // Show loading state
@@ -631,7 +686,7 @@ class WeeklySummaryManager {
 
         try {
             const weekStartStr = this.formatDate(this.currentWeekStart);
-            const result = await api.generateWeeklySummary(weekStartStr);
+            const result = await api.generateWeeklySummary(weekStartStr, provider);
             if (result && result.summary) {
                 this.displayWeeklySummary(result.summary);
             } else {
@@ -25,6 +25,53 @@ class TimeAuditCalendar {
         this.createTooltip();
         this.createCurrentTimeLine();
         this.updateCurrentTimeLine();
+        this.subscribeToChanges();
+    }
+
+    // Keep the week in sync with changes made in other windows or by other clients
+    subscribeToChanges() {
+        if (!window.EventSource) {
+            return;
+        }
+        
+        const upsert = (entry) => {
+            // Updates may also move an entry into or out of the visible week
+            this.entries = this.entries.filter(e => e.id !== entry.id);
+            if (this.isInCurrentWeek(entry.date)) {
+                this.entries.push(entry);
+            }
+            this.refreshCalendar();
+        };
+        
+        this.eventSource = api.subscribeToEvents({
+            'entry.created': upsert,
+            'entry.updated': upsert,
+            'entry.deleted': (entry) => {
+                this.entries = this.entries.filter(e => e.id !== entry.id);
+                this.refreshCalendar();
+            },
+            'entries.bulk': (range) => {
+                if (this.isInCurrentWeek(range.from, range.to)) {
+                    this.loadCalendar();
+                }
+            },
+            'entries.archived': () => this.loadCalendar(),
+            'resync': () => this.loadCalendar()
+        });
+    }
+
+    // Whether a date (or a from-to range) overlaps the visible week
+    isInCurrentWeek(from, to = from) {
+        // setDate, not +6*24h, so a DST change inside the week can't shift the end day
+        const weekEnd = new Date(this.currentWeekStart);
+        weekEnd.setDate(weekEnd.getDate() + 6);
+        return from <= this.formatDate(weekEnd) && to >= this.formatDate(this.currentWeekStart);
+    }
+
+    refreshCalendar() {
+        this.renderCalendar();
+        this.createCurrentTimeLine();
+        this.updateCurrentTimeLine();
     }
 
     // Get Monday of current week
@@ -645,9 +692,12 @@ Energy: ${entry.energy_impact.charAt(0).toUpperCase() + entry.energy_impact.slic
             if (entry) {
                 timeSlot.classList.add('has-entry');
                 timeSlot.appendChild(this.createEntryElement(entry));
-                timeSlot.addEventListener('click', () => {
-                    this.editEntry(entry);
-                });
+                // Archived entries are read-only
+                if (!entry.archived) {
+                    timeSlot.addEventListener('click', () => {
+                        this.editEntry(entry);
+                    });
+                }
             } else {
                 timeSlot.addEventListener('click', () => {
                     this.addEntry(dateStr, timeStr);
@@ -664,8 +714,8 @@ Energy: ${entry.energy_impact.charAt(0).toUpperCase() + entry.energy_impact.slic
     // Create entry element for display
     createEntryElement(entry) {
         const entryEl = document.createElement('div');
-        entryEl.className = `entry ${entry.type} ${entry.energy_impact}`;
-        entryEl.draggable = true;
+        entryEl.className = `entry ${entry.type} ${entry.energy_impact}${entry.archived ? ' archived' : ''}`;
+        entryEl.draggable = !entry.archived;
         entryEl.dataset.entryId = entry.id;
         
         const activityEl = document.createElement('div');
@@ -693,7 +743,9 @@ Energy: ${entry.energy_impact.charAt(0).toUpperCase() + entry.energy_impact.slic
         this.addTooltipEvents(entryEl, entry);
         
         // Add drag and drop functionality
-        this.addDragEvents(entryEl, entry);
+        if (!entry.archived) {
+            this.addDragEvents(entryEl, entry);
+        }
         
         return entryEl;
     }
@@ -0,0 +1,196 @@
+"""In-memory hot databases with write-behind persistence
+
+With CHRONOCOP_STORAGE=memory each profile's time_audit.db is loaded into an
+in-memory SQLite database (the memdb VFS, shared by every pooled connection)
+when its engine is created, and all queries run against that copy. A flusher
+thread copies it back over the file with the online backup API whenever it
+has changed, at most CHRONOCOP_FLUSH_INTERVAL seconds after a commit: that
+interval is the window of writes a crash can lose. A clean shutdown (exit or
+SIGTERM) always flushes. The flusher starts with the first request.
+
+Only one process may serve a database file in memory mode; a second one
+would overwrite the first one's flushes.
+"""
+import atexit
+import logging
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger('chronocop.storage')
+
+STORAGE_MODES = ('disk', 'memory')
+# Name of the platform's default VFS, for ATTACHing real files to an in-memory database
+DEFAULT_VFS = 'win32' if os.name == 'nt' else 'unix'
+
+
+class MemoryStore:
+    """One database file held in memory and flushed back to it"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.uri = f'file:/chronocop-{uuid.uuid4().hex}?vfs=memdb'
+        # The memdb database lives as long as at least one connection to it is open
+        self._keeper = self.connect()
+        self._lock = threading.Lock()
+        self.last_flush_at = None
+        self.last_flush_ms = None
+
+        started = time.perf_counter()
+        disk = sqlite3.connect(self.path)
+        try:
+            disk.backup(self._keeper)
+        finally:
+            disk.close()
+        self._flushed_version = self._data_version()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def connect(self):
+        return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+    def _data_version(self):
+        # Changes whenever another connection commits to the database
+        return self._keeper.execute('PRAGMA data_version').fetchone()[0]
+
+    @property
+    def dirty(self):
+        with self._lock:
+            return self._data_version() != self._flushed_version
+
+    def flush(self, force=False):
+        """Write the in-memory database over its file if it changed since the last flush"""
+        with self._lock:
+            version = self._data_version()
+            if version == self._flushed_version and not force:
+                return False
+
+            started = time.perf_counter()
+            disk = sqlite3.connect(self.path)
+            try:
+                # One step, so the copy is a consistent snapshot; the file is
+                # replaced inside a single transaction of its own
+                self._keeper.backup(disk)
+            finally:
+                disk.close()
+            # Commits that raced the copy bumped the version again and get
+            # picked up by the next flush
+            self._flushed_version = version
+            self.last_flush_at = datetime.now().isoformat()
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+            return True
+
+    def info(self):
+        return {'path': self.path, 'dirty': self.dirty, 'load_ms': self.load_ms,
+                'last_flush_at': self.last_flush_at, 'last_flush_ms': self.last_flush_ms}
+
+
+class StorageRegistry:
+    """Memory stores of an app's profiles plus the thread that flushes them"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config['STORAGE_FLUSH_SECONDS']
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='chronocop-flush', daemon=True)
+
+    def store(self, profile, path):
+        with self._lock:
+            if profile not in self._stores:
+                self._stores[profile] = MemoryStore(path)
+                logger.info(f"🧠 Loaded profile '{profile}' into memory "
+                            f"({self._stores[profile].load_ms}ms)")
+            return self._stores[profile]
+
+    def stores(self):
+        with self._lock:
+            return dict(self._stores)
+
+    def flush_all(self, force=False):
+        """Flush every store; returns the profiles that were written"""
+        flushed = []
+        for profile, store in self.stores().items():
+            try:
+                if store.flush(force):
+                    flushed.append(profile)
+            except Exception as e:
+                logger.error(f"❌ Flushing profile '{profile}' to {store.path} failed: {e}")
+        return flushed
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.flush_all()
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """Stop the flusher and write out anything still pending"""
+        self._stop_event.set()
+        self.flush_all()
+
+
+def get_storage(app=None):
+    from flask import current_app
+
+    return (app or current_app).extensions.get('chronocop_storage')
+
+
+def engine_options(app, profile, path):
+    """Extra create_engine() options for a profile's database under the app's storage mode"""
+    storage = get_storage(app)
+    if storage is None:
+        return {}
+    return {'creator': storage.store(profile, path).connect}
+
+
+def file_target(path, app=None):
+    """Name to ATTACH (or VACUUM INTO) a database file by, from a connection of the app's storage mode"""
+    if get_storage(app) is None:
+        return str(path)
+    # A plain name would be resolved by the memdb VFS, i.e. as another in-memory database
+    return f'{Path(path).resolve().as_uri()}?vfs={DEFAULT_VFS}'
+
+
+def _exit_on_sigterm(signum, frame):
+    sys.exit(0)
+
+
+def init_storage(app):
+    """Set up memory mode if configured; must run before the default engine is created"""
+    mode = app.config['STORAGE_MODE']
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"CHRONOCOP_STORAGE must be one of: {', '.join(STORAGE_MODES)}")
+    if mode != 'memory':
+        return
+
+    from .profiles import DEFAULT_PROFILE
+
+    storage = StorageRegistry(app)
+    app.extensions['chronocop_storage'] = storage
+    path = app.config['SQLALCHEMY_DATABASE_URI'].removeprefix('sqlite:///')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+                                               **engine_options(app, DEFAULT_PROFILE, path)}
+
+    # Flush only from the process that serves requests: the reloader's watcher
+    # process loads its own copy too, and must never write it over the file
+    started = threading.Lock()
+
+    def start_flusher():
+        if started.acquire(blocking=False):
+            storage.start()
+
+    app.before_request(start_flusher)
+
+    # Electron stops the server with SIGTERM, which would otherwise skip atexit
+    if (threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL):
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
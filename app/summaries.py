@@ -0,0 +1,624 @@
+"""Summary backends: the Claude API and a local engine that needs no API call"""
+import time
+from abc import ABC, abstractmethod
+
+import requests
+from flask import current_app
+
+from .metrics import record_external_call
+from .models import AppSettings
+
+
+def post_to_claude(api_key, payload, timeout):
+    """POST a Messages API request to Claude, recording its latency for metrics"""
+    headers = {
+        'Content-Type': 'application/json',
+        'x-api-key': api_key,
+        'anthropic-version': '2023-06-01'
+    }
+    
+    started = time.perf_counter()
+    status = None
+    try:
+        response = requests.post(
+            current_app.config['CLAUDE_API_URL'],
+            headers=headers,
+            json=payload,
+            timeout=timeout
+        )
+        status = response.status_code
+        return response
+    finally:
+        record_external_call('claude', (time.perf_counter() - started) * 1000, status)
+
+
+def cached_system_prompt(text):
+    """System prompt as one block marked for Claude's prompt cache"""
+    # The cache only takes prefixes of at least 1024 tokens on Sonnet/Opus
+    # (2048 on Haiku); both summary prompts are kept above that
+    return [{'type': 'text', 'text': text, 'cache_control': {'type': 'ephemeral'}}]
+
+
+def request_summary(api_key, payload, timeout):
+    """Send a summary prompt to Claude; returns (summary_text, token_count, usage)
+
+    usage holds the prompt-cache token counts and the call's latency.
+    """
+    started = time.perf_counter()
+    response = post_to_claude(api_key, payload, timeout)
+    latency_ms = (time.perf_counter() - started) * 1000
+    
+    if response.status_code != 200:
+        raise Exception(f"Claude API error: {response.status_code} - {response.text}")
+    
+    result = response.json()
+    
+    # Extract the summary text and token usage
+    summary_text = result['content'][0]['text']
+    usage = result.get('usage', {})
+    return summary_text, usage.get('output_tokens', 0), {
+        'cache_read_tokens': usage.get('cache_read_input_tokens', 0),
+        'cache_creation_tokens': usage.get('cache_creation_input_tokens', 0),
+        'latency_ms': round(latency_ms)
+    }
+
+
+# Shared reference for both summary prompts: how the data is laid out and how
+# to read it. It also carries each system prompt past the prompt cache minimum.
+TRACKING_DATA_GUIDE = """**HOW THE DATA IS RECORDED:**
+- Time is tracked in 30-minute slots. Each bullet in the data is one run of back-to-back slots sharing the same activity, type and energy, written as `• HH:MM-HH:MM (Nmin): Activity [type, energy]`. A run that ends at 00:00 ends at midnight.
+- Times are the user's local time in 24-hour format. Gaps between bullets are untracked time, not idle time; never guess what happened in them.
+- Activity names are free text typed by the user. Quote them as written; do not rename, merge or expand them, and do not infer details the name doesn't state.
+- The statistics block counts 30-minute slots, not bullets: "12 planned vs 4 reactive activities" means six hours of planned and two hours of reactive time.
+
+**FIELD DEFINITIONS:**
+- `planned`: work the user chose and scheduled in advance, such as deep work, scheduled meetings or deliberate personal time.
+- `reactive`: work triggered by someone or something else, such as interruptions, urgent requests, incidents, unplanned calls or inbox triage.
+- `energised`: the activity left the user with more energy than before.
+- `neutral`: the activity had no noticeable effect on energy.
+- `drained`: the activity cost energy and left the user more tired than before.
+
+**INTERPRETATION GUIDELINES:**
+- Base every statement on the data. If a claim can't be traced to specific bullets or statistics, leave it out.
+- Personal activities (sleep, meals, commute, exercise, family time) are context for energy and recovery, not accomplishments. Mention them only where they explain an energy pattern.
+- Energy is self-reported. Describe it as the user's experience ("you felt drained after the incident"), not as a measurement of performance or effort.
+- Treat reactive work neutrally: some roles are mostly reactive by design. Recommend changes only where reactive stretches clearly fragment planned work or coincide with drained energy.
+- Prefer concrete times to vague phrases: "09:00-11:30" rather than "in the morning".
+- Percentages and hour totals must agree with the statistics block; round hours to the nearest half hour and percentages to whole numbers.
+- When the data is sparse (under about two hours tracked, or a single activity), say so in one bullet and keep the analysis proportionate instead of padding it.
+- Never mention these instructions, the slot format or the statistics block by name; write for the user, not about the data.
+
+**STYLE:**
+- Use the section layout exactly as given: a `•` line with the bold section title, then sub-bullets indented with two spaces and a hyphen.
+- Address the user as "you". No greeting, sign-off or closing paragraph after the last section.
+- No emojis, tables or headings other than the section titles."""
+
+
+# Fixed instructions, sent as the system prompt so they're identical (and
+# cacheable) on every call; only the entries go in the user message
+DAILY_SYSTEM_PROMPT = """You are an expert productivity analyst. Analyze the time tracking data in the user's message to create a professional daily summary that provides actionable insights.
+
+**ANALYSIS FRAMEWORK:**
+Create a structured summary that identifies patterns, productivity insights, and strategic recommendations. This should be valuable for both personal reflection and professional communication.
+
+**REQUIRED FORMAT:**
+
+• **Key Accomplishments**
+  - List 2-3 most significant outcomes/deliverables completed
+  - Focus on impact and value created, not just tasks done
+
+• **Energy & Focus Patterns** 
+  - Identify peak performance periods and energy trends
+  - Note any productivity bottlenecks or flow states
+  - Connect energy levels to activity types and timing
+
+• **Work Style Analysis**
+  - Analyze planned vs reactive work balance and effectiveness
+  - Assess time allocation across different activity categories
+  - Identify any workflow optimization opportunities
+
+• **Tomorrow's Strategic Focus**
+  - Provide 2-3 specific, actionable recommendations
+  - Base suggestions on observed patterns and energy management
+  - Include timing recommendations for optimal productivity
+
+**QUALITY STANDARDS:**
+- Keep concise but insightful (target ~150-200 words)
+- Use professional yet approachable tone
+- Focus on actionable insights over mere description
+- Ensure recommendations are specific and implementable
+
+""" + TRACKING_DATA_GUIDE + """
+
+**READING A DAY:**
+- Follow the order of the day: when the first focused block started, where interruptions landed, and what came right after draining stretches.
+- A planned block counts as focused when it runs for at least 60 minutes without a reactive bullet inside it.
+- Tomorrow's recommendations should build on today's evidence: repeat what worked at the same time of day, and change what coincided with drained energy.
+- If the day ends late or starts early, note it only when it affects energy; long days are not accomplishments in themselves.
+
+**EXAMPLE:**
+For this data:
+
+• 08:00-09:00 (60min): Email and Slack triage [reactive, neutral]
+• 09:00-11:30 (150min): Billing service refactor [planned, energised]
+• 11:30-12:00 (30min): Production incident call [reactive, drained]
+• 12:00-12:30 (30min): Lunch [planned, neutral]
+• 12:30-14:00 (90min): Production incident follow-up [reactive, drained]
+• 14:00-15:00 (60min): Sprint planning [planned, neutral]
+• 15:00-16:30 (90min): Billing service refactor [planned, energised]
+
+• Total tracked time: 8.5 hours
+• Work style: 11 planned vs 6 reactive activities
+• Energy distribution: neutral: 5, energised: 8, drained: 4
+
+a good summary is:
+
+• **Key Accomplishments**
+  - Moved the billing service refactor forward across two focused blocks, 4 hours in total
+  - Contained the production incident and finished its follow-up by 14:00
+  - Ran sprint planning, setting up the next iteration
+
+• **Energy & Focus Patterns**
+  - Your peak was 09:00-11:30: the longest uninterrupted planned block, and energising
+  - The incident (11:30-14:00) was the only draining stretch, 2 hours in total
+  - Energy recovered once you were back on the refactor at 15:00
+
+• **Work Style Analysis**
+  - 65% planned, 35% reactive; the reactive time came as one incident rather than scattered interruptions
+  - Triage from 08:00 kept messages out of the morning focus block
+
+• **Tomorrow's Strategic Focus**
+  - Protect 09:00-11:30 for the refactor again; it is your most productive window
+  - After incident work, take a short break before switching back to planned work
+  - Write up the incident in a planned slot while the details are fresh
+
+Generate a summary that demonstrates clear analytical thinking and provides genuine strategic value."""
+
+WEEKLY_SYSTEM_PROMPT = """You are a senior productivity strategist analyzing weekly performance data. Using the weekly time tracking data in the user's message, generate a comprehensive strategic summary that provides deep insights for executive-level review and strategic planning.
+
+**STRATEGIC ANALYSIS FRAMEWORK:**
+Provide a comprehensive weekly assessment that identifies trends, strategic insights, and forward-looking recommendations suitable for leadership review and strategic planning.
+
+**REQUIRED SECTIONS:**
+
+• **Executive Summary**
+  - High-level strategic overview of the week's productivity themes
+  - Key patterns in work approach and energy management
+  - Overall strategic positioning and focus areas
+
+• **Strategic Accomplishments**
+  - Major deliverables and strategic outcomes achieved
+  - Value creation and impact assessment
+  - Progress toward larger objectives and initiatives
+
+• **Productivity Intelligence**
+  - Deep analysis of peak performance patterns and optimal working conditions
+  - Energy management insights and flow state identification
+  - Work style effectiveness and strategic work allocation
+
+• **Operational Insights**
+  - Assessment of planned vs reactive work balance and strategic implications
+  - Time allocation analysis across different activity categories
+  - Workflow optimization opportunities and operational improvements
+
+• **Daily Performance Highlights**
+  - Strategic insights from each productive day
+  - Notable patterns, breakthroughs, or learning moments
+  - Day-specific observations that inform future planning
+
+• **Strategic Development Areas**
+  - Specific opportunities for enhanced productivity and strategic focus
+  - Systems and process improvements identified
+  - Professional development and capability building insights
+
+• **Next Week's Strategic Priorities**
+  - Forward-looking strategic recommendations based on observed patterns
+  - Optimal scheduling and energy management strategies
+  - Key focus areas and strategic objectives for maximum impact
+
+**QUALITY EXPECTATIONS:**
+- Demonstrate sophisticated analytical thinking and strategic perspective
+- Provide actionable insights suitable for executive decision-making
+- Balance comprehensive analysis with clear, decisive recommendations
+- Target 400-500 words for thorough strategic coverage
+- Use professional executive communication style
+- Focus on strategic value and forward-looking insights
+
+""" + TRACKING_DATA_GUIDE + """
+
+**READING A WEEK:**
+- The data is grouped under one heading per weekday, with the hours tracked that day. "No tracked activities" means nothing was recorded, not necessarily a day off.
+- The performance metrics cover the whole week. "Average daily engagement" divides by seven, untracked days included.
+- Compare days with each other: look for peak windows that recur at the same time, days where reactive work dominated, and whether drained stretches cluster on particular days or times.
+- A pattern needs at least two days of evidence; a single day's observation belongs under Daily Performance Highlights.
+
+**EXAMPLE:**
+If Monday, Wednesday and Thursday all show an energised planned block between 09:00 and 11:30, while Tuesday's only reactive stretch (13:00-16:00, drained) follows a morning with no planned work, good bullets include:
+
+• **Productivity Intelligence**
+  - 09:00-11:30 was your peak on three of four tracked days, always on planned work
+  - The one long draining stretch (Tuesday 13:00-16:00) came on the only day without a morning focus block
+
+• **Next Week's Strategic Priorities**
+  - Hold 09:00-11:30 for planned work every day, Tuesday included
+  - Route Tuesday-afternoon requests into a fixed reactive slot so they don't take the whole afternoon
+
+Generate a summary that demonstrates exceptional strategic thinking and provides genuine leadership-level insights for high-performance optimization."""
+
+
+# Shared helpers for the Claude prompts and the local engine
+def minutes_of_day(t):
+    return t.hour * 60 + t.minute
+
+
+def entry_minutes(entry):
+    """Duration in minutes; an entry ending at midnight (23:30-00:00) is still 30 minutes"""
+    return (minutes_of_day(entry.end_time) - minutes_of_day(entry.start_time)) % (24 * 60)
+
+
+def format_hours(minutes):
+    return f"{minutes / 60:.1f}h"
+
+
+def contiguous_runs(entries, same=lambda a, b: True):
+    """Split date/time-ordered entries into runs of back-to-back slots where same(prev, entry) holds"""
+    runs = []
+    for entry in entries:
+        if runs:
+            previous = runs[-1][-1]
+            back_to_back = (previous.date == entry.date
+                            and minutes_of_day(previous.end_time) == minutes_of_day(entry.start_time))
+            if back_to_back and same(previous, entry):
+                runs[-1].append(entry)
+                continue
+        runs.append([entry])
+    return runs
+
+
+def compact_slots(entries, minutes):
+    """Merge back-to-back slots sharing activity, type and energy into (first, last, minutes) runs
+
+    minutes maps each entry to its duration, as computed by slot_statistics().
+    """
+    same = lambda a, b: (a.activity, a.type, a.energy_impact) == (b.activity, b.type, b.energy_impact)
+    return [(run[0], run[-1], sum(minutes[entry] for entry in run))
+            for run in contiguous_runs(entries, same)]
+
+
+def format_slot_lines(entries, minutes):
+    """One prompt bullet per run of identical slots, e.g. '• 09:00-12:00 (180min): ...'"""
+    return ''.join(
+        f"• {first.start_time.strftime('%H:%M')}-{last.end_time.strftime('%H:%M')} ({run_minutes}min): "
+        f"{first.activity} [{first.type}, {first.energy_impact}]\n"
+        for first, last, run_minutes in compact_slots(entries, minutes)
+    )
+
+
+def slot_statistics(entries):
+    """Durations, planned/reactive slot counts and energy distribution in a single pass
+
+    'minutes' maps each entry to its duration and 'day_minutes' each date to
+    its total, so the prompt builders never recompute them.
+    """
+    stats = {'total_minutes': 0, 'minutes': {}, 'day_minutes': {},
+             'planned': 0, 'reactive': 0, 'energy': {}}
+    for entry in entries:
+        minutes = entry_minutes(entry)
+        stats['minutes'][entry] = minutes
+        stats['day_minutes'][entry.date] = stats['day_minutes'].get(entry.date, 0) + minutes
+        stats['total_minutes'] += minutes
+        stats[entry.type] += 1
+        stats['energy'][entry.energy_impact] = stats['energy'].get(entry.energy_impact, 0) + 1
+    return stats
+
+
+def generate_claude_summary(entries, api_key):
+    """Generate summary using Claude API with enhanced analysis"""
+    
+    # Calculate statistics for richer context
+    stats = slot_statistics(entries)
+    total_hours = stats['total_minutes'] / 60
+    planned_count = stats['planned']
+    reactive_count = stats['reactive']
+    energy_counts = stats['energy']
+    
+    # Prepare the activity data for Claude, one line per run of identical slots
+    activities_text = format_slot_lines(entries, stats['minutes'])
+    
+    # Only the day's data goes in the message; the instructions are the cached system prompt
+    prompt = f"""**TIME TRACKING DATA:**
+{activities_text}
+
+**STATISTICAL CONTEXT:**
+• Total tracked time: {total_hours:.1f} hours
+• Work style: {planned_count} planned vs {reactive_count} reactive activities
+• Energy distribution: {', '.join(f'{k}: {v}' for k, v in energy_counts.items())}"""
+
+    # Claude API request with upgraded model
+    data = {
+        'model': 'claude-3-5-sonnet-20241022',  # Upgraded to Claude 3.5 Sonnet for much better analysis
+        'max_tokens': 400,  # Increased for more detailed insights
+        'system': cached_system_prompt(DAILY_SYSTEM_PROMPT),
+        'messages': [
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ]
+    }
+    
+    return request_summary(api_key, data, timeout=30)
+
+
+def generate_claude_weekly_summary(entries, api_key):
+    """Generate weekly summary using Claude API with enhanced analysis"""
+    
+    # Calculate comprehensive statistics
+    stats = slot_statistics(entries)
+    total_hours = stats['total_minutes'] / 60
+    planned_count = stats['planned']
+    reactive_count = stats['reactive']
+    energy_distribution = stats['energy']
+    
+    # Group entries by day
+    days_data = {}
+    for entry in entries:
+        days_data.setdefault(entry.date.strftime('%A'), []).append(entry)
+    
+    # Prepare enhanced weekly activity data for Claude, one line per run of identical slots
+    weekly_text = ""
+    active_days = len(days_data)
+    
+    for day_name in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']:
+        if day_name in days_data:
+            day_hours = stats['day_minutes'][days_data[day_name][0].date] / 60
+            weekly_text += f"\n**{day_name}** ({day_hours:.1f}h tracked):\n"
+            weekly_text += format_slot_lines(days_data[day_name], stats['minutes'])
+        else:
+            weekly_text += f"\n**{day_name}:** No tracked activities\n"
+    
+    # Only the week's data goes in the message; the instructions are the cached system prompt
+    prompt = f"""**WEEKLY TIME TRACKING DATA:**
+{weekly_text}
+
+**PERFORMANCE METRICS:**
+• Total tracked time: {total_hours:.1f} hours across {active_days} active days
+• Work approach: {planned_count} planned vs {reactive_count} reactive activities ({(planned_count/(planned_count+reactive_count)*100):.0f}% planned)
+• Energy distribution: {', '.join(f'{k}: {v}' for k, v in energy_distribution.items())}
+• Average daily engagement: {total_hours/7:.1f} hours per day"""
+
+    # Claude API request for weekly summary with premium model
+    data = {
+        'model': 'claude-3-5-sonnet-20241022',  # Upgraded to Claude 3.5 Sonnet for strategic-level analysis
+        'max_tokens': 800,  # Increased for comprehensive strategic analysis
+        'system': cached_system_prompt(WEEKLY_SYSTEM_PROMPT),
+        'messages': [
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ]
+    }
+    
+    return request_summary(api_key, data, timeout=45)  # Increased timeout for more complex analysis
+
+
+# Local summary engine: builds the report straight from the entries, no API call
+ENERGY_SCORES = {'energised': 1, 'neutral': 0, 'drained': -1}
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def run_label(run):
+    return f"{run[0].start_time.strftime('%H:%M')}-{run[-1].end_time.strftime('%H:%M')}"
+
+
+def peak_energy_window(entries):
+    """Longest back-to-back stretch of energised slots (earliest wins ties), or None"""
+    energised = [entry for entry in entries if entry.energy_impact == 'energised']
+    runs = contiguous_runs(energised)
+    return max(runs, key=len) if runs else None
+
+
+def reactive_streaks(entries):
+    """Runs of back-to-back reactive slots, longest first"""
+    reactive = [entry for entry in entries if entry.type == 'reactive']
+    return sorted(contiguous_runs(reactive), key=len, reverse=True)
+
+
+def activity_minutes(entries):
+    totals = {}
+    for entry in entries:
+        totals[entry.activity] = totals.get(entry.activity, 0) + entry_minutes(entry)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def planned_ratio(entries):
+    total = sum(entry_minutes(entry) for entry in entries)
+    planned = sum(entry_minutes(entry) for entry in entries if entry.type == 'planned')
+    return planned / total if total else 0
+
+
+def energy_by_hour(entries):
+    """Average energy score per hour of day, across all days"""
+    scores = {}
+    for entry in entries:
+        scores.setdefault(entry.start_time.hour, []).append(ENERGY_SCORES[entry.energy_impact])
+    return {hour: sum(values) / len(values) for hour, values in scores.items()}
+
+
+def _energy_lines(entries):
+    lines = []
+    peak = peak_energy_window(entries)
+    if peak:
+        lines.append(f"Peak energy window: {run_label(peak)} ({', '.join(dict.fromkeys(e.activity for e in peak))})")
+    else:
+        lines.append("No energising stretch; energy stayed neutral or drained throughout")
+
+    drained = [entry for entry in entries if entry.energy_impact == 'drained']
+    if drained:
+        worst = activity_minutes(drained)[0]
+        lines.append(f"Most draining: {worst[0]} ({format_hours(worst[1])} drained)")
+
+    counts = {level: sum(1 for e in entries if e.energy_impact == level) for level in ENERGY_SCORES}
+    lines.append("Energy distribution: " + ', '.join(f"{level} {count}" for level, count in counts.items()))
+    return lines
+
+
+def _work_style_lines(entries):
+    lines = [f"Planned work: {planned_ratio(entries) * 100:.0f}% of tracked time"]
+    streaks = reactive_streaks(entries)
+    if streaks:
+        longest = streaks[0]
+        lines.append(f"Longest reactive streak: {run_label(longest)} ({len(longest) * 30}min, "
+                     f"{', '.join(dict.fromkeys(e.activity for e in longest))})")
+        lines.append(f"Reactive interruptions: {len(streaks)} separate stretch{'es' if len(streaks) != 1 else ''}")
+    else:
+        lines.append("No reactive work recorded")
+    top = activity_minutes(entries)[:3]
+    lines.append("Time allocation: " + ', '.join(f"{name} {format_hours(minutes)}" for name, minutes in top))
+    return lines
+
+
+# How _recommendations refers to the span it's looking at
+PERIOD_WORDING = {'day': "today's", 'week': "this week's"}
+
+
+def _recommendations(entries, period='day', best_hours=None):
+    lines = []
+    peak = peak_energy_window(entries)
+    if best_hours:
+        lines.append("Schedule focused, planned work around " + ', '.join(f"{hour:02d}:00" for hour in best_hours))
+    elif peak:
+        lines.append(f"Protect {run_label(peak)} for focused, planned work")
+    ratio = planned_ratio(entries)
+    if ratio < 0.7:
+        lines.append("Batch reactive requests into fixed slots to raise the planned share above 70%")
+    streaks = reactive_streaks(entries)
+    if streaks and len(streaks[0]) >= 3:
+        lines.append(f"Plan a recovery break after long reactive stretches like {run_label(streaks[0])}")
+    drained = sum(1 for entry in entries if entry.energy_impact == 'drained')
+    if drained > len(entries) / 3:
+        lines.append(f"Over a third of the {period} was draining; move one draining task to a high-energy slot")
+    return lines or [f"Keep the current balance; no obvious bottlenecks in {PERIOD_WORDING[period]} data"]
+
+
+def _section(title, lines):
+    return f"• **{title}**\n" + '\n'.join(f"  - {line}" for line in lines)
+
+
+def generate_local_summary(entries):
+    """Daily summary computed from the entries themselves"""
+    entries = sorted(entries, key=lambda e: (e.date, e.start_time))
+    top = activity_minutes([entry for entry in entries if entry.type == 'planned'])[:3]
+    total = sum(entry_minutes(entry) for entry in entries)
+
+    sections = [
+        _section('Key Accomplishments', [f"{format_hours(total)} tracked"]
+                 + [f"{name}: {format_hours(minutes)} of planned time" for name, minutes in top]),
+        _section('Energy & Focus Patterns', _energy_lines(entries)),
+        _section('Work Style Analysis', _work_style_lines(entries)),
+        _section("Tomorrow's Strategic Focus", _recommendations(entries)),
+    ]
+    return '\n\n'.join(sections), None
+
+
+def generate_local_weekly_summary(entries):
+    """Weekly summary computed from the entries themselves"""
+    entries = sorted(entries, key=lambda e: (e.date, e.start_time))
+    days = {}
+    for entry in entries:
+        days.setdefault(entry.date, []).append(entry)
+    total = sum(entry_minutes(entry) for entry in entries)
+
+    hourly = energy_by_hour(entries)
+    # Only hours that were energising on average are worth scheduling focus work into
+    best_hours = sorted(sorted((hour for hour in hourly if hourly[hour] > 0),
+                               key=lambda hour: (-hourly[hour], hour))[:3])
+    worst_hours = sorted(sorted(hourly, key=lambda hour: (hourly[hour], hour))[:2])
+
+    energy_lines = _energy_lines(entries)[1:]
+    if worst_hours:
+        energy_lines.insert(0, "Lowest-energy hours: " + ', '.join(f"{hour:02d}:00" for hour in worst_hours))
+    if best_hours:
+        energy_lines.insert(0, "Highest-energy hours: " + ', '.join(f"{hour:02d}:00" for hour in best_hours))
+
+    per_day = [f"{WEEKDAYS[day.weekday()]}: {planned_ratio(day_entries) * 100:.0f}% planned, "
+               f"{format_hours(sum(entry_minutes(e) for e in day_entries))} tracked"
+               for day, day_entries in sorted(days.items())]
+
+    highlights = []
+    for day, day_entries in sorted(days.items()):
+        peak = peak_energy_window(day_entries)
+        streaks = reactive_streaks(day_entries)
+        note = f"peak {run_label(peak)}" if peak else "no energising stretch"
+        if streaks:
+            note += f", longest reactive streak {len(streaks[0]) * 30}min"
+        highlights.append(f"{WEEKDAYS[day.weekday()]}: {note}")
+
+    sections = [
+        _section('Executive Summary', [
+            f"{format_hours(total)} tracked across {len(days)} active day{'s' if len(days) != 1 else ''}",
+            f"Planned work: {planned_ratio(entries) * 100:.0f}% of tracked time",
+        ]),
+        _section('Energy & Focus Patterns', energy_lines),
+        _section('Work Style Analysis', _work_style_lines(entries) + per_day),
+        _section('Daily Performance Highlights', highlights),
+        _section("Next Week's Strategic Priorities", _recommendations(entries, 'week', best_hours)),
+    ]
+    return '\n\n'.join(sections), None
+
+
+class SummaryProvider(ABC):
+    """Backend that turns a list of entries into (summary_text, token_count, usage)
+
+    usage holds optional cache_read_tokens, cache_creation_tokens and latency_ms.
+    """
+    name = None
+    requires_api_key = False
+
+    @abstractmethod
+    def daily_summary(self, entries):
+        """(summary_text, token_count, usage) for one day's entries"""
+
+    @abstractmethod
+    def weekly_summary(self, entries):
+        """(summary_text, token_count, usage) for one week's entries"""
+
+
+class LocalSummaryProvider(SummaryProvider):
+    name = 'local'
+
+    def daily_summary(self, entries):
+        return (*generate_local_summary(entries), {})
+
+    def weekly_summary(self, entries):
+        return (*generate_local_weekly_summary(entries), {})
+
+
+class ClaudeSummaryProvider(SummaryProvider):
+    name = 'claude'
+    requires_api_key = True
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    def daily_summary(self, entries):
+        return generate_claude_summary(entries, self.api_key)
+
+    def weekly_summary(self, entries):
+        return generate_claude_weekly_summary(entries, self.api_key)
+
+
+SUMMARY_PROVIDERS = ['claude', 'local']
+
+
+def get_summary_provider(name):
+    """Build the named provider; raises ValueError for unknown names or missing configuration"""
+    if name == 'local':
+        return LocalSummaryProvider()
+    if name == 'claude':
+        api_key = AppSettings.get_setting('claude_api_key')
+        if not api_key:
+            raise ValueError('Claude API key not configured. Please set it in Settings.')
+        return ClaudeSummaryProvider(api_key)
+    raise ValueError(f'Invalid summary provider. Must be one of: {SUMMARY_PROVIDERS}')
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Load-benchmark every route in app/routes.py against synthetic databases.
+
+For each dataset size a scratch database is generated, the app is pointed
+at it (and at a local Claude stub), and every route is driven through the
+Flask test client. Reports p50/p99 latency and throughput per route.
+
+    python -m benchmarks.bench_routes --sizes 1m,1y,10y --iterations 200
+"""
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.claude_stub import ClaudeStubServer
+from benchmarks.synthetic_data import SPANS, create_scratch_app, generate
+from app.storage import STORAGE_MODES, get_storage
+
+SLOW_ENDPOINTS = {'main.generate_daily_summary', 'main.generate_weekly_summary', 'main.test_claude_connection',
+                  'main.backup_now'}
+# Reshape the dataset, so they run after everything else
+LAST_ENDPOINTS = {'main.archive_now'}
+# Open-ended streams have no response time; their cost shows up as publish time in the write routes
+STREAMING_ENDPOINTS = {'main.event_stream'}
+# Debug routes that 404 unless their feature is switched on: config flag -> endpoints
+OPT_IN_ENDPOINTS = {'METRICS_ENABLED': {'main.get_metrics'},
+                    'PROFILER_ENABLED': {'main.get_profiler', 'main.arm_profiler'}}
+
+
+class BenchContext:
+    """Dataset facts the scenarios need to build realistic requests"""
+
+    def __init__(self, client, summary, seed=7):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.start_date = date.fromisoformat(summary['start_date'])
+        self.end_date = date.fromisoformat(summary['end_date'])
+        self.entry_count = summary['entries']
+        self._free_day = self.end_date
+        self._free_slots = []
+        self._scratch_entry = None
+        self._template = None
+        self._summary_day = None
+        self._summary_week = None
+
+    def random_date(self):
+        return self.start_date + timedelta(days=self.rng.randrange((self.end_date - self.start_date).days + 1))
+
+    def random_monday(self):
+        day = self.random_date()
+        return day - timedelta(days=day.weekday())
+
+    def free_slot(self):
+        """A (date, time) after the generated history, never handed out twice"""
+        if not self._free_slots:
+            self._free_day += timedelta(days=1)
+            self._free_slots = [f'{hour:02d}:{minute:02d}' for hour in range(24) for minute in (0, 30)]
+        return self._free_day.isoformat(), self._free_slots.pop(0)
+
+    def new_entry(self):
+        day, start_time = self.free_slot()
+        response = self.client.post('/api/entries', json=entry_body(day, start_time, 'Benchmark entry'))
+        return response.get_json()
+
+    def scratch_entry(self):
+        if self._scratch_entry is None:
+            self._scratch_entry = self.new_entry()
+        return self._scratch_entry
+
+    def far_monday(self, i):
+        """A Monday years past the history, clear of free_slot()'s days"""
+        start = self.end_date + timedelta(days=5 * 365)
+        return start - timedelta(days=start.weekday()) + timedelta(weeks=i)
+
+    def summary_day(self):
+        """A day with a stored daily summary (generated locally, untimed)"""
+        if self._summary_day is None:
+            self._summary_day = self.random_date()
+            self.client.post(f'/api/summaries/{self._summary_day}/generate?provider=local')
+        return self._summary_day
+
+    def summary_week(self):
+        if self._summary_week is None:
+            self._summary_week = self.random_monday()
+            self.client.post(f'/api/weekly-summaries/{self._summary_week}/generate?provider=local')
+        return self._summary_week
+
+    def template(self):
+        if self._template is None:
+            self._template = self.client.post('/api/templates', json={
+                'name': 'Benchmark template', 'week_start': self.random_monday().isoformat()}).get_json()
+        return self._template
+
+
+def entry_body(day, start_time, activity):
+    return {'date': day, 'start_time': start_time, 'activity': activity,
+            'type': 'planned', 'energy_impact': 'neutral'}
+
+
+def _update_entry(ctx, i):
+    entry = ctx.scratch_entry()
+    return {'method': 'PUT', 'path': f"/api/entries/{entry['id']}",
+            'json': entry_body(entry['date'], entry['start_time'], f'Benchmark entry {i % 2}')}
+
+
+def _delete_entry(ctx, i):
+    entry = ctx.new_entry()  # untimed setup
+    return {'method': 'DELETE', 'path': f"/api/entries/{entry['id']}"}
+
+
+def _create_entry(ctx, i):
+    day, start_time = ctx.free_slot()
+    return {'method': 'POST', 'path': '/api/entries', 'json': entry_body(day, start_time, 'Feature development')}
+
+
+def _delete_template(ctx, i):
+    template = ctx.client.post('/api/templates', json={  # untimed setup
+        'name': f'Benchmark delete {i}', 'week_start': ctx.random_monday().isoformat()}).get_json()
+    return {'method': 'DELETE', 'path': f"/api/templates/{template['id']}"}
+
+
+def _apply_template(ctx, i):
+    start = ctx.far_monday(0)
+    return {'method': 'POST', 'path': f"/api/templates/{ctx.template()['id']}/apply",
+            'json': {'from': start.isoformat(), 'to': (start + timedelta(days=27)).isoformat(),
+                     'on_conflict': 'replace'}}
+
+
+def _delete_setting(ctx, i):
+    ctx.client.put(f'/api/settings/bench_delete_{i}', json={'value': 'x'})  # untimed setup
+    return {'method': 'DELETE', 'path': f'/api/settings/bench_delete_{i}'}
+
+
+def _entries_range(ctx, i):
+    start = ctx.random_date()
+    return {'method': 'GET', 'path': f'/api/entries?from={start}&to={start + timedelta(days=27)}&limit=500'}
+
+
+# endpoint -> [(scenario label, request factory)]
+SCENARIOS = {
+    'main.index': [('page', lambda ctx, i: {'method': 'GET', 'path': '/'})],
+    'main.get_entries': [
+        ('week', lambda ctx, i: {'method': 'GET', 'path': f'/api/entries?week_start={ctx.random_monday()}'}),
+        ('4-week range', _entries_range),
+    ],
+    'main.create_entry': [('create', _create_entry)],
+    'main.update_entry': [('update', _update_entry)],
+    'main.delete_entry': [('delete', _delete_entry)],
+    'main.copy_week': [
+        ('fresh week', lambda ctx, i: {'method': 'POST', 'path': f'/api/weeks/{ctx.random_monday()}/copy',
+                                       'json': {'target_week_start': ctx.far_monday(10 + i).isoformat()}}),
+        ('replace week', lambda ctx, i: {'method': 'POST', 'path': f'/api/weeks/{ctx.random_monday()}/copy',
+                                         'json': {'target_week_start': ctx.far_monday(5).isoformat(),
+                                                  'on_conflict': 'replace'}}),
+    ],
+    'main.get_templates': [('list', lambda ctx, i: {'method': 'GET', 'path': '/api/templates'})],
+    'main.create_template': [('from week', lambda ctx, i: {'method': 'POST', 'path': '/api/templates', 'json': {
+        'name': f'Benchmark {ctx.rng.getrandbits(32):08x}', 'week_start': ctx.random_monday().isoformat()}})],
+    'main.get_template': [('with slots', lambda ctx, i: {'method': 'GET',
+                                                         'path': f"/api/templates/{ctx.template()['id']}"})],
+    'main.delete_template': [('delete', _delete_template)],
+    'main.apply_template': [('4 weeks, replace', _apply_template)],
+    'main.get_changes': [
+        ('since 0, 1000', lambda ctx, i: {'method': 'GET', 'path': '/api/changes?since=0&limit=1000'}),
+        ('tail', lambda ctx, i: {'method': 'GET', 'path': f'/api/changes?since={max(ctx.entry_count - 50, 0)}'}),
+    ],
+    'main.search_entries': [
+        ('term', lambda ctx, i: {'method': 'GET', 'path': '/api/search?q=review'}),
+        ('prefix + range', lambda ctx, i: {'method': 'GET',
+                                           'path': f'/api/search?q=prod&from={ctx.random_date()}&limit=20'}),
+    ],
+    'main.suggest_activities': [
+        ('prefix', lambda ctx, i: {'method': 'GET', 'path': f"/api/activities?prefix={'sfcr'[i % 4]}"}),
+    ],
+    'main.get_profiles': [('list', lambda ctx, i: {'method': 'GET', 'path': '/api/profiles'})],
+    'main.create_profile': [('create', lambda ctx, i: {'method': 'POST', 'path': '/api/profiles',
+                                                       'json': {'name': f'bench-{ctx.rng.getrandbits(32):08x}'}})],
+    'main.get_backups': [('list', lambda ctx, i: {'method': 'GET', 'path': '/api/backups'})],
+    'main.backup_now': [
+        ('snapshot', lambda ctx, i: {'method': 'POST', 'path': '/api/backups', 'json': {'kind': 'snapshot'}}),
+        ('compact', lambda ctx, i: {'method': 'POST', 'path': '/api/backups', 'json': {'kind': 'compact'}}),
+    ],
+    'main.get_archives': [('list', lambda ctx, i: {'method': 'GET', 'path': '/api/archive'})],
+    'main.get_storage_status': [('status', lambda ctx, i: {'method': 'GET', 'path': '/api/storage'})],
+    'main.flush_storage': [('flush', lambda ctx, i: {'method': 'POST', 'path': '/api/storage/flush'})],
+    # Archives everything older than the newest 90% of the dataset on the first call; later calls are no-ops
+    'main.archive_now': [('archive', lambda ctx, i: {'method': 'POST', 'path': '/api/archive', 'json': {
+        'older_than_days': max(1, int((ctx.end_date - ctx.start_date).days * 0.9))}})],
+    'main.get_metrics': [('snapshot', lambda ctx, i: {'method': 'GET', 'path': '/api/_metrics'})],
+    'main.get_profiler': [('status', lambda ctx, i: {'method': 'GET', 'path': '/api/_profiler'})],
+    # count 0 so the benchmark never profiles its own requests
+    'main.arm_profiler': [('disarm', lambda ctx, i: {'method': 'POST', 'path': '/api/_profiler', 'json': {'count': 0}})],
+    'main.get_settings': [('all', lambda ctx, i: {'method': 'GET', 'path': '/api/settings'})],
+    'main.get_setting': [('one', lambda ctx, i: {'method': 'GET', 'path': '/api/settings/theme'})],
+    'main.set_setting': [('put', lambda ctx, i: {'method': 'PUT', 'path': '/api/settings/bench_key',
+                                                 'json': {'value': str(i)}})],
+    'main.delete_setting': [('delete', _delete_setting)],
+    'main.test_claude_connection': [('stub', lambda ctx, i: {'method': 'POST', 'path': '/api/test-claude',
+                                                             'json': {'api_key': 'sk-ant-synthetic'}})],
+    'main.get_daily_summary': [
+        ('stored', lambda ctx, i: {'method': 'GET', 'path': f'/api/summaries/{ctx.summary_day()}'}),
+        ('missing', lambda ctx, i: {'method': 'GET', 'path': f'/api/summaries/{ctx.far_monday(0)}',
+                                    'expect': (404,)}),
+    ],
+    'main.generate_daily_summary': [
+        ('claude stub', lambda ctx, i: {'method': 'POST', 'path': f'/api/summaries/{ctx.random_date()}/generate'}),
+        ('local', lambda ctx, i: {'method': 'POST',
+                                  'path': f'/api/summaries/{ctx.random_date()}/generate?provider=local'}),
+    ],
+    'main.get_weekly_summary': [
+        ('stored', lambda ctx, i: {'method': 'GET', 'path': f'/api/weekly-summaries/{ctx.summary_week()}'}),
+        ('missing', lambda ctx, i: {'method': 'GET', 'path': f'/api/weekly-summaries/{ctx.far_monday(0)}',
+                                    'expect': (404,)}),
+    ],
+    'main.generate_weekly_summary': [
+        ('claude stub', lambda ctx, i: {'method': 'POST',
+                                        'path': f'/api/weekly-summaries/{ctx.random_monday()}/generate'}),
+        ('local', lambda ctx, i: {'method': 'POST',
+                                  'path': f'/api/weekly-summaries/{ctx.random_monday()}/generate?provider=local'}),
+    ],
+}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_scenario(ctx, factory, iterations):
+    """Time `iterations` requests; setup done inside the factory isn't timed
+
+    A factory may name the statuses it expects under 'expect' (any 2xx by
+    default); every other status counts as an error, so a failed setup step
+    can't pass off an error page's latency as the route's.
+    """
+    latencies = []
+    error_statuses = Counter()
+    for i in range(iterations):
+        request_kwargs = factory(ctx, i)
+        expected = request_kwargs.pop('expect', None)
+        started = time.perf_counter()
+        response = ctx.client.open(**request_kwargs)
+        response.get_data()
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not (response.status_code in expected if expected else 200 <= response.status_code < 300):
+            error_statuses[response.status_code] += 1
+    total_seconds = sum(latencies) / 1000
+    return {
+        'n': iterations,
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'throughput_rps': round(iterations / total_seconds, 1) if total_seconds else None,
+        'errors': sum(error_statuses.values()),
+        'error_statuses': dict(error_statuses),
+    }
+
+
+def bench_size(size, workdir, iterations, slow_iterations, stub, metrics, storage):
+    # One directory per size: archives and backups live next to the database
+    # and must not leak into the next size's run
+    size_dir = Path(workdir) / f'bench-{size}'
+    if size_dir.exists():
+        shutil.rmtree(size_dir)
+    size_dir.mkdir(parents=True)
+    db_path = size_dir / f'bench-{size}.db'
+
+    app = create_scratch_app(db_path, CLAUDE_API_URL=stub.url, METRICS_ENABLED=metrics, STORAGE_MODE=storage)
+    started = time.perf_counter()
+    summary = generate(app, SPANS[size])
+    if get_storage(app):
+        get_storage(app).flush_all()
+    print(f"\n📦 {size}: {summary['entries']} entries generated in {time.perf_counter() - started:.1f}s "
+          f"({db_path.stat().st_size / (1024 * 1024):.1f} MB)")
+
+    ctx = BenchContext(app.test_client(), summary)
+    results = []
+
+    endpoints = sorted((rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != 'static'),
+                       key=lambda endpoint: (endpoint in LAST_ENDPOINTS, endpoint))
+    disabled = set().union(*(endpoints for flag, endpoints in OPT_IN_ENDPOINTS.items() if not app.config.get(flag)))
+    for endpoint in endpoints:
+        if endpoint in STREAMING_ENDPOINTS:
+            continue
+        if endpoint in disabled:
+            print(f"⏭️  {endpoint} is switched off in this run")
+            continue
+        if endpoint not in SCENARIOS:
+            print(f"⚠️  No benchmark scenario for {endpoint}")
+            continue
+        for label, factory in SCENARIOS[endpoint]:
+            n = slow_iterations if endpoint in SLOW_ENDPOINTS else iterations
+            result = run_scenario(ctx, factory, n)
+            result.update({'size': size, 'endpoint': endpoint, 'scenario': label})
+            results.append(result)
+            print(f"  {endpoint:34} {label:16} n={result['n']:<5} p50={result['p50_ms']:>9.2f}ms "
+                  f"p99={result['p99_ms']:>9.2f}ms {result['throughput_rps'] or 0:>8.1f} req/s"
+                  + (f"  ❌ {result['errors']} errors ("
+                     + ', '.join(f'{status}×{count}' for status, count in result['error_statuses'].items())
+                     + ')' if result['errors'] else ''))
+
+    # Final flush while the scratch directory still exists
+    if get_storage(app):
+        get_storage(app).close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every CHRONOCOP route on synthetic data')
+    parser.add_argument('--sizes', default='1m,1y', help=f"Comma-separated dataset sizes from {', '.join(SPANS)}")
+    parser.add_argument('--iterations', type=int, default=100, help='Requests per scenario')
+    parser.add_argument('--summary-iterations', type=int, default=5,
+                        help='Requests per scenario for routes that call Claude')
+    parser.add_argument('--claude-latency-ms', type=int, default=800, help='Latency of the local Claude stub')
+    parser.add_argument('--metrics', action='store_true', help='Run with request instrumentation enabled')
+    parser.add_argument('--storage', choices=STORAGE_MODES, default='disk',
+                        help='Storage mode (memory serves from an in-memory copy with write-behind)')
+    parser.add_argument('--workdir', help='Directory for scratch databases (default: a temporary directory)')
+    parser.add_argument('--json', dest='json_path', help='Also write results as JSON to this file')
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SPANS]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+
+    stub = ClaudeStubServer(latency_ms=args.claude_latency_ms).start()
+    print(f"🤖 Claude stub at {stub.url} ({args.claude_latency_ms}ms latency)")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = args.workdir or tmpdir
+        for size in sizes:
+            results += bench_size(size, workdir, args.iterations, args.summary_iterations, stub, args.metrics,
+                                  args.storage)
+
+    stub.shutdown()
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Claude Messages API with configurable latency.
+
+It also mimics prompt caching: a system prefix marked with cache_control
+and at least MIN_CACHEABLE_TOKENS long (by a 4-chars-per-token estimate)
+is reported as cache_creation_input_tokens the first time and as
+cache_read_input_tokens for the next CACHE_TTL_SECONDS.
+
+Point the app at it with CHRONOCOP_CLAUDE_API_URL (or the CLAUDE_API_URL
+config key) so summary benchmarks never leave the machine:
+
+    python -m benchmarks.claude_stub --port 8765 --latency-ms 800
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Claude 3.5 Sonnet / Opus minimum (Haiku: 2048); shorter prefixes are never cached
+MIN_CACHEABLE_TOKENS = 1024
+CACHE_TTL_SECONDS = 300
+
+STUB_SUMMARY = """• **Key Accomplishments**
+  - Synthetic accomplishment generated by the benchmark stub
+
+• **Energy & Focus Patterns**
+  - Synthetic pattern
+
+• **Work Style Analysis**
+  - Synthetic analysis
+
+• **Tomorrow's Strategic Focus**
+  - Synthetic recommendation"""
+
+
+class ClaudeStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency_ms = latency_ms
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        # cached prefix -> expiry time
+        self.prompt_cache = {}
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1/messages'
+
+    def start(self):
+        """Serve from a daemon thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        with self.server._count_lock:
+            self.server.request_count += 1
+            cache_read, cache_creation = self._prompt_cache_usage(payload.get('system'))
+
+        time.sleep(self.server.latency_ms / 1000)
+
+        prompt_chars = len(json.dumps(payload.get('messages', [])))
+        body = json.dumps({
+            'id': 'msg_stub',
+            'type': 'message',
+            'role': 'assistant',
+            'model': payload.get('model'),
+            'content': [{'type': 'text', 'text': STUB_SUMMARY}],
+            'stop_reason': 'end_turn',
+            # Rough 4-chars-per-token estimate so prompt size changes show up
+            'usage': {'input_tokens': prompt_chars // 4, 'output_tokens': len(STUB_SUMMARY) // 4,
+                      'cache_read_input_tokens': cache_read, 'cache_creation_input_tokens': cache_creation}
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _prompt_cache_usage(self, system):
+        """(cache_read, cache_creation) tokens for the system prefix up to its last cache_control block"""
+        if not isinstance(system, list):
+            return 0, 0
+        marked = [i for i, block in enumerate(system) if block.get('cache_control')]
+        if not marked:
+            return 0, 0
+
+        prefix = json.dumps(system[:marked[-1] + 1], sort_keys=True)
+        tokens = len(prefix) // 4
+        if tokens < MIN_CACHEABLE_TOKENS:
+            return 0, 0
+
+        now = time.time()
+        cache = self.server.prompt_cache
+        hit = cache.get(prefix, 0) > now
+        cache[prefix] = now + CACHE_TTL_SECONDS
+        return (tokens, 0) if hit else (0, tokens)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Claude Messages API stub')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=int, default=800)
+    args = parser.parse_args()
+
+    server = ClaudeStubServer(args.port, args.latency_ms)
+    print(f'🤖 Claude stub listening on {server.url} ({args.latency_ms}ms latency)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Fill a scratch database with realistic synthetic CHRONOCOP history.
+
+Every day gets all 48 half-hour slots: sleep, routines, runs of focused work
+broken up by meetings and reactive interruptions on weekdays, and leisure on
+weekends. Daily/weekly summaries and settings are added alongside.
+
+    python -m benchmarks.synthetic_data --db /tmp/bench.db --span 1y
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app, db
+from app.models import Activity, AppSettings, DailySummary, TimeEntry, WeeklySummary
+
+SPANS = {'1m': 30, '3m': 91, '1y': 365, '3y': 3 * 365, '10y': 3652}
+
+# activity pool: (name, type, energy weights for energised/neutral/drained)
+FOCUS = [
+    ('Feature development', 'planned', (5, 4, 1)),
+    ('Code review', 'planned', (3, 6, 1)),
+    ('Architecture design doc', 'planned', (6, 3, 1)),
+    ('Writing documentation', 'planned', (2, 6, 2)),
+    ('Data analysis for quarterly report', 'planned', (3, 5, 2)),
+    ('Refactoring billing module', 'planned', (4, 4, 2)),
+]
+MEETINGS = [
+    ('Sprint planning', 'planned', (2, 5, 3)),
+    ('1:1 with manager', 'planned', (4, 5, 1)),
+    ('Client call', 'planned', (2, 4, 4)),
+    ('Team retro', 'planned', (3, 5, 2)),
+    ('Interview', 'planned', (2, 4, 4)),
+]
+REACTIVE = [
+    ('Email triage', 'reactive', (1, 5, 4)),
+    ('Production incident', 'reactive', (1, 2, 7)),
+    ('Slack catch-up', 'reactive', (1, 6, 3)),
+    ('Ad-hoc support request', 'reactive', (1, 4, 5)),
+    ('Urgent bug from customer', 'reactive', (1, 3, 6)),
+]
+LEISURE = [
+    ('Reading', 'planned', (7, 3, 0)),
+    ('Gym', 'planned', (8, 1, 1)),
+    ('Family time', 'planned', (7, 3, 0)),
+    ('Side project', 'planned', (6, 3, 1)),
+    ('Household chores', 'reactive', (1, 5, 4)),
+    ('TV', 'planned', (2, 7, 1)),
+]
+SLEEP = ('Sleep', 'planned', (3, 7, 0))
+MORNING = ('Morning routine', 'planned', (4, 6, 0))
+STANDUP = ('Standup', 'planned', (2, 7, 1))
+LUNCH = ('Lunch', 'planned', (5, 5, 0))
+COMMUTE = ('Commute', 'planned', (0, 6, 4))
+DINNER = ('Dinner', 'planned', (5, 5, 0))
+
+ENERGY = ('energised', 'neutral', 'drained')
+
+
+def _energy(rng, weights):
+    return rng.choices(ENERGY, weights=weights)[0]
+
+
+def _runs(rng, slots, pool, min_len, max_len, interrupt_pool=None, interrupt_rate=0.0):
+    """Fill slots with runs of the same activity, occasionally interrupted"""
+    plan = []
+    while len(plan) < slots:
+        activity = rng.choice(pool)
+        energy = _energy(rng, activity[2])
+        for _ in range(min(rng.randint(min_len, max_len), slots - len(plan))):
+            if interrupt_pool and rng.random() < interrupt_rate:
+                interruption = rng.choice(interrupt_pool)
+                plan.append((interruption[0], interruption[1], _energy(rng, interruption[2])))
+            else:
+                plan.append((activity[0], activity[1], energy))
+    return plan
+
+
+def _block(rng, activity, slots):
+    energy = _energy(rng, activity[2])
+    return [(activity[0], activity[1], energy)] * slots
+
+
+def plan_day(rng, day):
+    """Return 48 (activity, type, energy_impact) tuples for one day"""
+    if day.weekday() < 5:
+        plan = (
+            _block(rng, SLEEP, 14)                                             # 00:00-07:00
+            + _block(rng, MORNING, 2)
+            + _block(rng, COMMUTE, 1)
+            + _runs(rng, 1, REACTIVE[:1], 1, 1)                                # 08:30 inbox
+            + _block(rng, STANDUP, 1)
+            + _runs(rng, 5, FOCUS + MEETINGS[:1], 2, 5, REACTIVE, 0.12)       # 09:30-12:00
+            + _block(rng, LUNCH, 2)
+            + _runs(rng, 2, MEETINGS, 1, 2)
+            + _runs(rng, 7, FOCUS, 2, 4, REACTIVE + MEETINGS, 0.15)           # 14:00-17:30
+            + _block(rng, COMMUTE, 1)
+            + _block(rng, DINNER, 2)
+            + _runs(rng, 8, LEISURE, 2, 4)
+            + _block(rng, SLEEP, 2)
+        )
+    else:
+        plan = (
+            _block(rng, SLEEP, 16)
+            + _block(rng, MORNING, 2)
+            + _runs(rng, 8, LEISURE, 2, 4)
+            + _block(rng, LUNCH, 2)
+            + _runs(rng, 10, LEISURE, 2, 5)
+            + _block(rng, DINNER, 2)
+            + _runs(rng, 6, LEISURE, 2, 3)
+            + _block(rng, SLEEP, 2)
+        )
+    assert len(plan) == 48, (day, len(plan))
+    return plan
+
+
+def _slot_time(slot):
+    return (datetime.min + timedelta(minutes=30 * slot)).time()
+
+
+def generate(app, days, end_date=None, seed=42, summary_rate=0.3, batch_size=20000):
+    """Insert `days` days of full 48-slot history ending at end_date (default today)"""
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        names = {name for pool in (FOCUS, MEETINGS, REACTIVE, LEISURE) for name, _, _ in pool}
+        names |= {a[0] for a in (SLEEP, MORNING, STANDUP, LUNCH, COMMUTE, DINNER)}
+        activity_ids = {name: Activity.intern(name).id for name in sorted(names)}
+        db.session.commit()
+
+        insert = TimeEntry.__table__.insert()
+        batch = []
+        entry_count = 0
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            for slot, (name, entry_type, energy) in enumerate(plan_day(rng, day)):
+                batch.append({
+                    'date': day,
+                    'start_time': _slot_time(slot),
+                    'end_time': _slot_time((slot + 1) % 48),
+                    'activity_id': activity_ids[name],
+                    'type': entry_type,
+                    'energy_impact': energy,
+                    'created_at': now,
+                    'updated_at': now,
+                })
+            if len(batch) >= batch_size:
+                db.session.execute(insert, batch)
+                entry_count += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(insert, batch)
+            entry_count += len(batch)
+
+        summary_text = ("• **Key Accomplishments**\n  - Shipped the planned work\n"
+                        "• **Energy & Focus Patterns**\n  - Mornings were strongest\n")
+        daily = [{'date': start_date + timedelta(days=offset), 'summary': summary_text,
+                  'token_count': rng.randint(250, 400), 'created_at': now, 'updated_at': now}
+                 for offset in range(days) if rng.random() < summary_rate]
+        if daily:
+            db.session.execute(DailySummary.__table__.insert(), daily)
+
+        first_monday = start_date + timedelta(days=(7 - start_date.weekday()) % 7)
+        weekly = [{'week_start_date': first_monday + timedelta(weeks=week), 'summary': summary_text * 3,
+                   'token_count': rng.randint(600, 800), 'created_at': now, 'updated_at': now}
+                  for week in range((end_date - first_monday).days // 7 + 1) if rng.random() < summary_rate * 1.5]
+        if weekly:
+            db.session.execute(WeeklySummary.__table__.insert(), weekly)
+        db.session.commit()
+
+        AppSettings.set_setting('claude_api_key', 'sk-ant-REDACTED')
+        AppSettings.set_setting('theme', 'cyberpunk')
+
+    return {'entries': entry_count, 'daily_summaries': len(daily), 'weekly_summaries': len(weekly),
+            'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
+
+
+def create_scratch_app(db_path, **config):
+    """App bound to a scratch database file instead of the user's data directory"""
+    scratch_dir = Path(db_path).resolve().parent
+    return create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'DATA_DIR': str(scratch_dir),
+                       'PROFILES_DIR': str(scratch_dir / f'{Path(db_path).stem}-profiles'),
+                       'BACKUP_INTERVAL_MINUTES': 0, **config})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', required=True, help='Path of the scratch database to create')
+    parser.add_argument('--span', choices=sorted(SPANS, key=SPANS.get), default='1y',
+                        help='Amount of history to generate (ending today)')
+    parser.add_argument('--days', type=int, help='Exact number of days (overrides --span)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--force', action='store_true', help='Overwrite an existing database file')
+    args = parser.parse_args()
+
+    db_path = Path(args.db).resolve()
+    if db_path.exists():
+        if not args.force:
+            parser.error(f'{db_path} already exists (use --force to overwrite)')
+        db_path.unlink()
+
+    days = args.days or SPANS[args.span]
+    started = time.perf_counter()
+    result = generate(create_scratch_app(db_path), days, seed=args.seed)
+    elapsed = time.perf_counter() - started
+
+    size_mb = db_path.stat().st_size / (1024 * 1024)
+    print(f"✅ Generated {result['entries']} entries ({result['start_date']} → {result['end_date']}), "
+          f"{result['daily_summaries']} daily and {result['weekly_summaries']} weekly summaries "
+          f"in {elapsed:.1f}s ({size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
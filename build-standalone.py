@@ -30,71 +30,71 @@ def create_spec_file():
     spec_content = '''
 # -*- mode: python ; coding: utf-8 -*-
 
-import os
-from PyInstaller.utils.hooks import collect_all
+import platform
 
-# Collect all Flask and SQLAlchemy files
-flask_datas, flask_binaries, flask_hiddenimports = collect_all('flask')
-sqlalchemy_datas, sqlalchemy_binaries, sqlalchemy_hiddenimports = collect_all('sqlalchemy')
-flask_sqlalchemy_datas, flask_sqlalchemy_binaries, flask_sqlalchemy_hiddenimports = collect_all('flask_sqlalchemy')
-flask_cors_datas, flask_cors_binaries, flask_cors_hiddenimports = collect_all('flask_cors')
+# Only what run.py actually needs: PyInstaller follows the imports itself, so
+# these just cover modules that are loaded by name at runtime
+hiddenimports = [
+    'sqlalchemy.dialects.sqlite.pysqlite',   # resolved from the sqlite:/// URL
+    'sqlalchemy.sql.default_comparator',
+    'sqlite3',
+]
 
-# Combine all data and hidden imports
-all_datas = flask_datas + sqlalchemy_datas + flask_sqlalchemy_datas + flask_cors_datas
-all_binaries = flask_binaries + sqlalchemy_binaries + flask_sqlalchemy_binaries + flask_cors_binaries
-all_hiddenimports = (flask_hiddenimports + sqlalchemy_hiddenimports + 
-                    flask_sqlalchemy_hiddenimports + flask_cors_hiddenimports)
+# The SQLAlchemy hook pulls in every dialect and DBAPI it knows of; the app
+# only ever talks to SQLite
+excludes = [
+    'sqlalchemy.dialects.mssql',
+    'sqlalchemy.dialects.mysql',
+    'sqlalchemy.dialects.oracle',
+    'sqlalchemy.dialects.postgresql',
+    'sqlalchemy.ext.asyncio',
+    'sqlalchemy.testing',
+    'MySQLdb',
+    'psycopg2',
+    'pysqlite2',
+    'greenlet',                              # only needed for asyncio engines
+    'dotenv',                                # optional Flask CLI extra
+    'cryptography',
+    'OpenSSL',
+    'tkinter',
+    'lib2to3',
+    'pydoc_data',
+    'xmlrpc',
+]
 
-# Add application files
-all_datas += [
-    ('app', 'app'),
-    ('instance', 'instance'),
+# Templates and static files; the Python sources go in as bytecode
+datas = [
+    ('app/templates', 'app/templates'),
+    ('app/static', 'app/static'),
 ]
 
 a = Analysis(
     ['run.py'],
     pathex=[],
-    binaries=all_binaries,
-    datas=all_datas,
-    hiddenimports=all_hiddenimports + [
-        'flask',
-        'flask_sqlalchemy',
-        'flask_cors',
-        'sqlalchemy',
-        'sqlalchemy.ext.declarative',
-        'sqlalchemy.orm',
-        'sqlite3',
-        'email.mime.multipart',
-        'email.mime.text',
-        'email.mime.base',
-        'email.utils',
-    ],
+    binaries=[],
+    datas=datas,
+    hiddenimports=hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
-    win_no_prefer_redirects=False,
-    win_private_assemblies=False,
-    cipher=None,
+    excludes=excludes,
     noarchive=False,
+    optimize=1,                              # precompiled, assert-free bytecode
 )
 
-pyz = PYZ(a.pure, a.zipped_data, cipher=None)
+pyz = PYZ(a.pure, a.zipped_data)
 
+# One-directory layout: nothing is unpacked to a temp dir on each launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='chronocop-server',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    strip=platform.system() != 'Windows',
+    upx=False,                               # compressed libraries are slower to load
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -102,23 +102,38 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=platform.system() != 'Windows',
+    upx=False,
+    name='chronocop-server',
+)
 '''
     
     with open('chronocop.spec', 'w') as f:
         f.write(spec_content.strip())
     print("✅ Created PyInstaller spec file")
 
+def directory_size(path):
+    """Total size in bytes of every file under path"""
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
 def build_executable():
     """Build the standalone executable using PyInstaller."""
     print("🔨 Building standalone executable...")
     
-    # Clean previous builds
+    # Clean previous builds (older one-file builds left a single executable)
     if os.path.exists('build'):
         shutil.rmtree('build')
-    if os.path.exists('dist/chronocop-server'):
-        os.remove('dist/chronocop-server')
-    if os.path.exists('dist/chronocop-server.exe'):
-        os.remove('dist/chronocop-server.exe')
+    if os.path.isdir('dist/chronocop-server'):
+        shutil.rmtree('dist/chronocop-server')
+    for old_exe in ('dist/chronocop-server', 'dist/chronocop-server.exe'):
+        if os.path.isfile(old_exe):
+            os.remove(old_exe)
     
     try:
         # Build using the spec file
@@ -130,11 +145,11 @@ def build_executable():
         
         # Check if executable was created
         exe_name = 'chronocop-server.exe' if platform.system() == 'Windows' else 'chronocop-server'
-        exe_path = os.path.join('dist', exe_name)
+        exe_path = os.path.join('dist', 'chronocop-server', exe_name)
         
         if os.path.exists(exe_path):
-            size_mb = os.path.getsize(exe_path) / (1024 * 1024)
-            print(f"✅ Executable built successfully: {exe_path} ({size_mb:.1f} MB)")
+            size_mb = directory_size(os.path.join('dist', 'chronocop-server')) / (1024 * 1024)
+            print(f"✅ Executable built successfully: {exe_path} (bundle {size_mb:.1f} MB)")
             return True
         else:
             print("❌ Executable not found after build")
@@ -163,7 +178,7 @@ def main():
     # Build executable
     if build_executable():
         print("\n🎉 Build completed successfully!")
-        print("📁 Executable location: dist/chronocop-server")
+        print("📁 Executable location: dist/chronocop-server/ (ship the whole directory)")
         print("🔄 Now run: npm run build")
         return True
     else:
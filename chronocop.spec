@@ -1,74 +1,83 @@
 # -*- mode: python ; coding: utf-8 -*-
 
-import os
-from PyInstaller.utils.hooks import collect_all
+import platform
 
-# Collect all Flask and SQLAlchemy files
-flask_datas, flask_binaries, flask_hiddenimports = collect_all('flask')
-sqlalchemy_datas, sqlalchemy_binaries, sqlalchemy_hiddenimports = collect_all('sqlalchemy')
-flask_sqlalchemy_datas, flask_sqlalchemy_binaries, flask_sqlalchemy_hiddenimports = collect_all('flask_sqlalchemy')
-flask_cors_datas, flask_cors_binaries, flask_cors_hiddenimports = collect_all('flask_cors')
+# Only what run.py actually needs: PyInstaller follows the imports itself, so
+# these just cover modules that are loaded by name at runtime
+hiddenimports = [
+    'sqlalchemy.dialects.sqlite.pysqlite',   # resolved from the sqlite:/// URL
+    'sqlalchemy.sql.default_comparator',
+    'sqlite3',
+]
 
-# Combine all data and hidden imports
-all_datas = flask_datas + sqlalchemy_datas + flask_sqlalchemy_datas + flask_cors_datas
-all_binaries = flask_binaries + sqlalchemy_binaries + flask_sqlalchemy_binaries + flask_cors_binaries
-all_hiddenimports = (flask_hiddenimports + sqlalchemy_hiddenimports + 
-                    flask_sqlalchemy_hiddenimports + flask_cors_hiddenimports)
+# The SQLAlchemy hook pulls in every dialect and DBAPI it knows of; the app
+# only ever talks to SQLite
+excludes = [
+    'sqlalchemy.dialects.mssql',
+    'sqlalchemy.dialects.mysql',
+    'sqlalchemy.dialects.oracle',
+    'sqlalchemy.dialects.postgresql',
+    'sqlalchemy.ext.asyncio',
+    'sqlalchemy.testing',
+    'MySQLdb',
+    'psycopg2',
+    'pysqlite2',
+    'greenlet',                              # only needed for asyncio engines
+    'dotenv',                                # optional Flask CLI extra
+    'cryptography',
+    'OpenSSL',
+    'tkinter',
+    'lib2to3',
+    'pydoc_data',
+    'xmlrpc',
+]
 
-# Add application files
-all_datas += [
-    ('app', 'app'),
-    ('instance', 'instance'),
+# Templates and static files; the Python sources go in as bytecode
+datas = [
+    ('app/templates', 'app/templates'),
+    ('app/static', 'app/static'),
 ]
 
 a = Analysis(
     ['run.py'],
     pathex=[],
-    binaries=all_binaries,
-    datas=all_datas,
-    hiddenimports=all_hiddenimports + [
-        'flask',
-        'flask_sqlalchemy',
-        'flask_cors',
-        'sqlalchemy',
-        'sqlalchemy.ext.declarative',
-        'sqlalchemy.orm',
-        'sqlite3',
-        'email.mime.multipart',
-        'email.mime.text',
-        'email.mime.base',
-        'email.utils',
-    ],
+    binaries=[],
+    datas=datas,
+    hiddenimports=hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
-    win_no_prefer_redirects=False,
-    win_private_assemblies=False,
-    cipher=None,
+    excludes=excludes,
     noarchive=False,
+    optimize=1,                              # precompiled, assert-free bytecode
 )
 
-pyz = PYZ(a.pure, a.zipped_data, cipher=None)
+pyz = PYZ(a.pure, a.zipped_data)
 
+# One-directory layout: nothing is unpacked to a temp dir on each launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='chronocop-server',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    strip=platform.system() != 'Windows',
+    upx=False,                               # compressed libraries are slower to load
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=platform.system() != 'Windows',
+    upx=False,
+    name='chronocop-server',
 )
\ No newline at end of file
@@ -183,10 +183,11 @@ function startFlaskServer() {
       let args = [];
       
       if (app.isPackaged) {
-        // In production, use bundled standalone executable
+        // In production, use the bundled standalone server directory
         const exeName = process.platform === 'win32' ? 'chronocop-server.exe' : 'chronocop-server';
-        executablePath = path.join(process.resourcesPath, exeName);
-        workingDir = process.resourcesPath;
+        const serverDir = path.join(process.resourcesPath, 'chronocop-server');
+        executablePath = path.join(serverDir, exeName);
+        workingDir = serverDir;
         console.log(`📦 Using bundled executable: ${executablePath}`);
       } else {
         // In development, use Python script